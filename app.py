@@ -17,7 +17,9 @@ from services.db import (
     get_db, ensure_tables, get_dashboard_stats, get_jobs, get_job,
     update_job_status, update_job, bulk_update_status,
     get_sources, get_statuses, get_search_queries, get_followups_due,
+    get_pipeline_counts,
 )
+from services.db_pool import read_conn
 
 app = FastAPI(title="JobHunter3000")
 
@@ -60,8 +62,10 @@ def startup():
     os.makedirs("data/cover-letters", exist_ok=True)
     os.makedirs("data/generated", exist_ok=True)
     os.makedirs("logs", exist_ok=True)
+    from services.llm_cache import prune
     conn = get_db()
     ensure_tables(conn)
+    prune(conn)  # drop cached LLM completions past retention
     conn.close()
 
 
@@ -90,10 +94,9 @@ async def dashboard(request: Request):
     if not _is_setup_complete(settings):
         return RedirectResponse(url="/setup", status_code=302)
     from services.resumes import validate_candidate_profile
-    conn = get_db()
-    stats = get_dashboard_stats(conn)
-    followups = get_followups_due(conn)
-    conn.close()
+    with read_conn() as conn:
+        stats = get_dashboard_stats(conn)
+        followups = get_followups_due(conn)
     profile_warnings = validate_candidate_profile()
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
@@ -119,24 +122,13 @@ async def jobs_page(request: Request,
     if min_score is None:
         min_score = settings.get("display_min_score", 0)
 
-    conn = get_db()
-    jobs = get_jobs(conn, status=status, source=source, sort=sort, order=order,
-                    limit=500, min_score=min_score, search_query=search_query,
-                    max_age_hours=freshness, favorites_only=bool(favorites))
-    statuses = get_statuses(conn)
-    sources = get_sources(conn)
-    search_queries = get_search_queries(conn)
-    conn.close()
-
-    # Parse JSON fields for template rendering
-    for job in jobs:
-        for field in ("pros", "cons"):
-            val = job.get(field)
-            if isinstance(val, str):
-                try:
-                    job[field] = json.loads(val)
-                except (json.JSONDecodeError, TypeError):
-                    job[field] = []
+    with read_conn() as conn:
+        jobs = get_jobs(conn, status=status, source=source, sort=sort, order=order,
+                        limit=500, min_score=min_score, search_query=search_query,
+                        max_age_hours=freshness, favorites_only=bool(favorites))
+        statuses = get_statuses(conn)
+        sources = get_sources(conn)
+        search_queries = get_search_queries(conn)
 
     return templates.TemplateResponse("jobs.html", {
         "request": request,
@@ -157,9 +149,8 @@ async def jobs_page(request: Request,
 
 @app.get("/jobs/{job_id}", response_class=HTMLResponse)
 async def job_detail_page(request: Request, job_id: int):
-    conn = get_db()
-    job = get_job(conn, job_id)
-    conn.close()
+    with read_conn() as conn:
+        job = get_job(conn, job_id)
     if not job:
         return RedirectResponse(url="/jobs", status_code=302)
 
@@ -243,10 +234,9 @@ async def job_detail_page(request: Request, job_id: int):
 
 @app.get("/pipeline", response_class=HTMLResponse)
 async def pipeline_page(request: Request):
-    conn = get_db()
-    # Group jobs by status
-    all_jobs = get_jobs(conn, limit=500)
-    conn.close()
+    with read_conn() as conn:
+        # Group jobs by status
+        all_jobs = get_jobs(conn, limit=500)
 
     pipeline = {
         "new": [],
@@ -285,11 +275,13 @@ async def analytics_page(request: Request):
     ).fetchall()
     weekly_apps = [dict(r) for r in reversed(weekly_apps)]
 
+    # Funnel, response rate and total all derive from the per-status counts
+    status_counts = get_pipeline_counts(conn)
+
     # Stage conversion funnel
     funnel = {}
     for status in ['new', 'interested', 'applied', 'interviewing', 'offer', 'accepted']:
-        row = conn.execute("SELECT COUNT(*) as cnt FROM jobs WHERE status = ?", (status,)).fetchone()
-        funnel[status] = row["cnt"]
+        funnel[status] = status_counts.get(status, 0)
 
     # Score distribution
     score_dist = {}
@@ -312,16 +304,12 @@ async def analytics_page(request: Request):
     source_stats = [dict(r) for r in source_stats]
 
     # Response rate
-    total_applied = conn.execute(
-        "SELECT COUNT(*) as cnt FROM jobs WHERE status IN ('applied','interviewing','offer','accepted')"
-    ).fetchone()["cnt"]
-    total_responses = conn.execute(
-        "SELECT COUNT(*) as cnt FROM jobs WHERE status IN ('interviewing','offer','accepted')"
-    ).fetchone()["cnt"]
+    total_applied = sum(status_counts.get(s, 0) for s in ('applied', 'interviewing', 'offer', 'accepted'))
+    total_responses = sum(status_counts.get(s, 0) for s in ('interviewing', 'offer', 'accepted'))
     response_rate = round(total_responses / total_applied * 100, 1) if total_applied > 0 else 0
 
     # Total stats
-    total_jobs = conn.execute("SELECT COUNT(*) as cnt FROM jobs").fetchone()["cnt"]
+    total_jobs = sum(status_counts.values())
     avg_score = conn.execute("SELECT ROUND(AVG(score),1) as avg FROM jobs WHERE score IS NOT NULL").fetchone()["avg"] or 0
 
     conn.close()
@@ -536,7 +524,7 @@ async def api_capture_job(request: Request):
     if url:
         norm_url = _normalize_url(url)
         existing = conn.execute(
-            "SELECT id, score, fit_summary, pros, cons FROM jobs WHERE url = ? OR url = ?",
+            "SELECT id, score, fit_summary, pros, cons FROM jobs WHERE url IN (?, ?) AND url != ''",
             (url, norm_url),
         ).fetchone()
         if existing:
@@ -640,18 +628,17 @@ async def api_get_jobs(status: Optional[str] = None,
                        sort: Optional[str] = "created_at",
                        order: Optional[str] = "desc",
                        limit: int = 100, offset: int = 0):
-    conn = get_db()
-    jobs = get_jobs(conn, status=status, source=source, sort=sort, order=order,
-                    limit=limit, offset=offset)
-    conn.close()
+    with read_conn() as conn:
+        # Full rows: API clients read description, pros/cons and fit_summary
+        jobs = get_jobs(conn, status=status, source=source, sort=sort, order=order,
+                        limit=limit, offset=offset, columns="*")
     return JSONResponse(jobs)
 
 
 @app.get("/api/jobs/{job_id}")
 async def api_get_job(job_id: int):
-    conn = get_db()
-    job = get_job(conn, job_id)
-    conn.close()
+    with read_conn() as conn:
+        job = get_job(conn, job_id)
     if not job:
         return JSONResponse({"error": "Job not found"}, status_code=404)
 
@@ -739,12 +726,18 @@ async def api_update_notes(job_id: int, request: Request):
 
 @app.get("/api/stats")
 async def api_stats():
-    conn = get_db()
-    stats = get_dashboard_stats(conn)
-    conn.close()
+    with read_conn() as conn:
+        stats = get_dashboard_stats(conn)
     return JSONResponse(stats)
 
 
+@app.get("/api/stats/llm")
+async def api_llm_stats():
+    """LLM completion cache counters since the server started."""
+    from services.llm_cache import stats
+    return JSONResponse(stats())
+
+
 @app.get("/api/settings")
 async def api_get_settings():
     settings = load_settings()
@@ -794,6 +787,7 @@ async def api_test_llm():
             return llm_chat(
                 [{"role": "user", "content": "Say 'JobHunter3000 connected!' and nothing else."}],
                 settings,
+                use_cache=False,
             )
 
         loop = asyncio.get_event_loop()
@@ -845,21 +839,34 @@ async def api_import_spreadsheet():
 @app.post("/api/resumes/upload")
 async def api_upload_resume(file: UploadFile = File(...)):
     """Upload a resume file."""
-    from services.resumes import save_resume, extract_text, insert_resume
+    from services.resumes import (
+        MAX_RESUME_BYTES, RESUME_TYPES,
+        save_resume, extract_text, find_extracted_text, insert_resume,
+    )
 
-    allowed = {".pdf", ".docx", ".md", ".txt"}
     ext = os.path.splitext(file.filename or "")[1].lower()
-    if ext not in allowed:
+    if ext not in RESUME_TYPES:
         return JSONResponse(
             {"error": f"Unsupported file type: {ext}. Use PDF, DOCX, MD, or TXT."},
             status_code=400,
         )
+    # Reject oversized uploads before reading them into memory
+    if file.size is not None and file.size > MAX_RESUME_BYTES:
+        return JSONResponse(
+            {"error": f"File too large: limit is {MAX_RESUME_BYTES // (1024 * 1024)} MB."},
+            status_code=400,
+        )
 
     contents = await file.read()
-    metadata = save_resume(contents, file.filename)
-    content_text = extract_text(metadata["file_path"], metadata["file_type"])
+    try:
+        metadata = save_resume(contents, file.filename)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
 
     conn = get_db()
+    content_text = find_extracted_text(conn, metadata["sha256"])
+    if content_text is None:
+        content_text = extract_text(metadata["file_path"], metadata["file_type"])
     resume_id = insert_resume(conn, metadata, content_text)
     conn.close()
 
@@ -887,7 +894,8 @@ async def api_analyze_resume(resume_id: int):
     conn.close()
 
     def _do_analysis():
-        analysis = analyze_resume(content_text, settings)
+        # An explicit (re-)analyze always asks the LLM again
+        analysis = analyze_resume(content_text, settings, use_cache=False)
         analysis_conn = get_db()
         try:
             update_resume_analysis(analysis_conn, resume_id, analysis)
@@ -927,8 +935,9 @@ async def api_delete_resume(resume_id: int):
 
 def _run_analyze_all(force: bool = False, model_override: str = None):
     """Synchronous worker for analyze-all (runs in thread pool)."""
+    from services.db import batch
     from services.resumes import (
-        get_resumes, analyze_resume,
+        get_resumes, batch_analyze,
         update_resume_analysis, synthesize_candidate_profile,
     )
 
@@ -944,10 +953,11 @@ def _run_analyze_all(force: bool = False, model_override: str = None):
             settings["ollama_model"] = model_override
 
     conn = get_db()
-    resumes = get_resumes(conn)
+    resumes = get_resumes(conn, columns="id, original_name, content_text, analysis")
 
     results = {"analyzed": 0, "skipped": 0, "errors": [], "model": model_override or "default"}
 
+    pending = []
     for r in resumes:
         if r.get("analysis") and not force:
             results["skipped"] += 1
@@ -957,16 +967,22 @@ def _run_analyze_all(force: bool = False, model_override: str = None):
             results["errors"].append(f"{r['original_name']}: no text content")
             continue
 
-        try:
-            analysis = analyze_resume(r["content_text"], settings)
+        pending.append(r)
+
+    # LLM calls overlap; the results are then stored in a single transaction
+    # force re-analyzes from scratch, so stored completions are skipped too
+    analyses = batch_analyze([r["content_text"] for r in pending], settings, use_cache=not force)
+    with batch(conn):
+        for r, analysis in zip(pending, analyses):
+            if isinstance(analysis, Exception):
+                results["errors"].append(f"{r['original_name']}: {str(analysis)}")
+                continue
             update_resume_analysis(conn, r["id"], analysis)
             results["analyzed"] += 1
-        except Exception as e:
-            results["errors"].append(f"{r['original_name']}: {str(e)}")
 
     # Synthesize the unified profile from all resumes
     try:
-        profile = synthesize_candidate_profile(conn, settings)
+        profile = synthesize_candidate_profile(conn, settings, use_cache=not force)
         results["profile"] = profile
     except Exception as e:
         results["profile_error"] = str(e)
@@ -1486,7 +1502,8 @@ async def api_interview_prep(job_id: int):
     settings = load_settings()
 
     def _gen():
-        result = generate_interview_prep(job, settings)
+        # A first generation may reuse a stored reply; Regenerate Prep always asks again
+        result = generate_interview_prep(job, settings, use_cache=not job.get("interview_prep"))
         if not result.get("error"):
             # Store in DB
             store_conn = get_db()
@@ -1628,7 +1645,7 @@ async def api_job_chat(job_id: int, request: Request):
     messages.append({"role": "user", "content": user_message})
 
     def _chat():
-        return llm_chat(messages, settings)
+        return llm_chat(messages, settings, use_cache=False)
 
     try:
         loop = asyncio.get_event_loop()
@@ -1642,12 +1659,14 @@ async def api_job_chat(job_id: int, request: Request):
 async def api_suggest_searches():
     """Use AI to suggest search strategies based on candidate profile."""
     import asyncio
+    from functools import partial
     from services.scorer import suggest_searches
 
     settings = load_settings()
 
     loop = asyncio.get_event_loop()
-    results = await loop.run_in_executor(None, suggest_searches, settings, None)
+    # Each click asks for fresh ideas rather than replaying the last suggestions
+    results = await loop.run_in_executor(None, partial(suggest_searches, settings, use_cache=False))
     return JSONResponse(results)
 
 
@@ -1685,6 +1704,34 @@ async def api_generate_resume(job_id: int):
         return JSONResponse({"error": str(e)}, status_code=500)
 
 
+@app.post("/api/jobs/bulk-generate")
+async def api_bulk_generate(request: Request):
+    """Generate tailored resumes for multiple jobs at once."""
+    import asyncio
+    from services.generator import generate_batch
+
+    body = await request.json()
+    job_ids = body.get("job_ids", [])
+    if not job_ids:
+        return JSONResponse({"error": "job_ids are required"}, status_code=400)
+
+    conn = get_db()
+    jobs = [job for job in (get_job(conn, job_id) for job_id in job_ids) if job]
+    conn.close()
+    if not jobs:
+        return JSONResponse({"error": "No matching jobs"}, status_code=404)
+
+    settings = load_settings()
+    loop = asyncio.get_event_loop()
+    results = await loop.run_in_executor(None, generate_batch, jobs, settings)
+    failed = [{"job_id": r["job_id"], "error": r["error"]} for r in results if r.get("error")]
+    return JSONResponse({
+        "ok": True,
+        "generated": len(results) - len(failed),
+        "failed": failed,
+    })
+
+
 @app.post("/api/jobs/{job_id}/generate-cover-letter")
 async def api_generate_cover_letter(job_id: int):
     """Generate a tailored cover letter for a job posting."""
@@ -14,7 +14,7 @@ import json
 import os
 import subprocess
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
@@ -26,86 +26,114 @@ from services.settings import load_settings
 
 # ── Config ────────────────────────────────────────────────
 # Override via environment variables or edit here for your setup
-EMAIL_TO = os.environ.get("JH3000_EMAIL_TO", "")
+EMAIL_TO = os.environ.get("JH3000_EMAIL_TO", "")  # comma-separated for multiple recipients
 EMAIL_FROM = os.environ.get("JH3000_EMAIL_FROM", "")
 LOG_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs", "morning-digest.log")
 APP_URL = os.environ.get("JH3000_APP_URL", "http://localhost:8001")
 
+MAX_RUNS_SHOWN = 10
+
+# Only the job columns the digest actually renders
+JOB_COLUMNS = "id, title, company, location, score, url, fit_summary, salary_text, pros"
+
+# Static body for days with nothing new — skips the full build_email render
+QUIET_BODY = """<!DOCTYPE html>
+<html>
+<head><meta charset="UTF-8"></head>
+<body style="margin:0; padding:0; background:#0f1117; font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',sans-serif;">
+<div style="max-width:600px; margin:0 auto; padding:20px; text-align:center;">
+    <h1 style="margin:0; font-size:22px; color:#e0e0e0; letter-spacing:0.5px;">
+        Job<span style="color:#22d3ee;">Hunter</span>3000
+    </h1>
+    <p style="margin:4px 0 16px; font-size:13px; color:#666;">Morning Briefing &mdash; {date}</p>
+    <p style="font-size:14px; color:#999;">Nothing new in the last 24 hours. {awaiting} jobs still awaiting review.</p>
+    <a href="{app_url}/dashboard" style="display:inline-block; padding:10px 24px; background:#22d3ee;
+       color:#0f1117; font-weight:600; font-size:14px; border-radius:6px; text-decoration:none;">
+        Open Mission Control
+    </a>
+</div>
+</body>
+</html>"""
+
+# ── SQL ───────────────────────────────────────────────────
+# Module-level so every digest run binds the same statement text and hits
+# the connection's prepared-statement cache.
+_SQL_NEW_JOBS = (
+    f"SELECT {JOB_COLUMNS} FROM jobs WHERE created_at > ? AND (score >= ? OR score IS NULL) ORDER BY score DESC"
+)
+_SQL_TOTAL_NEW = "SELECT COUNT(*) as cnt FROM jobs WHERE created_at > ?"
+_SQL_TIER_COUNT = "SELECT COUNT(*) as cnt FROM jobs WHERE created_at > ? AND score >= ? AND score <= ?"
+_SQL_UNSCORED_NEW = "SELECT COUNT(*) as cnt FROM jobs WHERE created_at > ? AND score IS NULL"
+_SQL_RANKED_MATCHES = f"""SELECT * FROM (
+       SELECT {JOB_COLUMNS}, status, created_at,
+              COUNT(*) FILTER (WHERE status = 'new' AND score >= :min_score) OVER () AS awaiting,
+              ROW_NUMBER() OVER (ORDER BY score DESC, created_at DESC) AS match_rank,
+              ROW_NUMBER() OVER (PARTITION BY status = 'new' ORDER BY score DESC, created_at DESC) AS new_rank
+       FROM jobs
+       WHERE score >= :floor
+         AND status NOT IN ('applied', 'rejected', 'offer', 'accepted', 'archived')
+   )
+   WHERE (score >= 60 AND (match_rank <= 10 OR (status = 'new' AND new_rank <= 5)))
+      OR match_rank = 1  -- always keep one row to carry the awaiting count
+   ORDER BY score DESC, created_at DESC"""
+_SQL_PIPELINE = "SELECT status, COUNT(*) as cnt FROM jobs GROUP BY status"
+_SQL_RECENT_RUNS = """SELECT status, jobs_found, jobs_new, jobs_scored, notifications_sent, started_at,
+          COUNT(*) OVER () AS total_runs
+   FROM scrape_runs WHERE started_at > ? ORDER BY started_at DESC LIMIT ?"""
+_SQL_TOTAL = "SELECT COUNT(*) as cnt FROM jobs"
+_SQL_SCORED = "SELECT COUNT(*) as cnt FROM jobs WHERE score IS NOT NULL"
+_SQL_AVG_SCORE = "SELECT AVG(score) as avg FROM jobs WHERE score IS NOT NULL"
+
 
 def get_digest_data():
     """Gather all data for the morning digest."""
     conn = get_db()
     settings = load_settings()
 
-    # Time window: last 24 hours
-    yesterday = (datetime.now() - timedelta(hours=24)).isoformat()
+    # Time window: last 24 hours — one clock read so every query and the header share it.
+    # jobs.created_at and scrape_runs.started_at are SQLite datetime('now') values: UTC, space-separated
+    now = datetime.now(timezone.utc)
+    yesterday = (now - timedelta(hours=24)).strftime("%Y-%m-%d %H:%M:%S")
     min_score = settings.get("display_min_score", 40)
 
     # New jobs found in last 24h (only above display threshold)
-    new_jobs = conn.execute(
-        "SELECT * FROM jobs WHERE created_at > ? AND (score >= ? OR score IS NULL) ORDER BY score DESC",
-        (yesterday, min_score),
-    ).fetchall()
-    new_jobs = [dict(r) for r in new_jobs]
+    new_jobs = conn.execute(_SQL_NEW_JOBS, (yesterday, min_score)).fetchall()
 
     # Total new (for context — "X new, Y worth reviewing")
-    total_new_raw = conn.execute(
-        "SELECT COUNT(*) as cnt FROM jobs WHERE created_at > ?",
-        (yesterday,),
-    ).fetchone()["cnt"]
+    total_new_raw = conn.execute(_SQL_TOTAL_NEW, (yesterday,)).fetchone()["cnt"]
 
     # Score tier breakdown (last 24h)
     score_tiers = {}
     for label, lo, hi in [("80+", 80, 999), ("60-79", 60, 79), ("40-59", 40, 59), ("below 40", 0, 39)]:
-        cnt = conn.execute(
-            "SELECT COUNT(*) as cnt FROM jobs WHERE created_at > ? AND score >= ? AND score <= ?",
-            (yesterday, lo, hi),
-        ).fetchone()["cnt"]
+        cnt = conn.execute(_SQL_TIER_COUNT, (yesterday, lo, hi)).fetchone()["cnt"]
         score_tiers[label] = cnt
-    unscored = conn.execute(
-        "SELECT COUNT(*) as cnt FROM jobs WHERE created_at > ? AND score IS NULL",
-        (yesterday,),
-    ).fetchone()["cnt"]
+    unscored = conn.execute(_SQL_UNSCORED_NEW, (yesterday,)).fetchone()["cnt"]
     score_tiers["unscored"] = unscored
 
-    # Top matches (score >= 60) not yet applied
-    top_matches = conn.execute(
-        """SELECT * FROM jobs WHERE score >= 60 AND status NOT IN ('applied', 'rejected', 'offer', 'accepted', 'archived')
-           ORDER BY score DESC LIMIT 10"""
+    # Top matches (score >= 60, not yet applied), top 5 fresh 'new' jobs, and the
+    # awaiting-action count in one pass: window functions rank and count the
+    # candidate rows so the three result sets share a single index seek.
+    ranked = conn.execute(
+        _SQL_RANKED_MATCHES,
+        {"min_score": min_score, "floor": min(min_score, 60)},
     ).fetchall()
-    top_matches = [dict(r) for r in top_matches]
+    top_matches = [r for r in ranked if r["score"] >= 60 and r["match_rank"] <= 10]
+    top5_today = [r for r in ranked if r["score"] >= 60 and r["status"] == "new" and r["new_rank"] <= 5]
+    awaiting = ranked[0]["awaiting"] if ranked else 0
 
     # Pipeline counts
     pipeline = {}
-    rows = conn.execute("SELECT status, COUNT(*) as cnt FROM jobs GROUP BY status").fetchall()
+    rows = conn.execute(_SQL_PIPELINE).fetchall()
     for r in rows:
         pipeline[r["status"]] = r["cnt"]
 
-    # Recent scrape runs in last 24h
-    runs = conn.execute(
-        "SELECT * FROM scrape_runs WHERE started_at > ? ORDER BY started_at DESC",
-        (yesterday,),
-    ).fetchall()
-    runs = [dict(r) for r in runs]
-
-    # Jobs awaiting action (scored above threshold, status still 'new')
-    awaiting = conn.execute(
-        "SELECT COUNT(*) as cnt FROM jobs WHERE score >= ? AND status = 'new'",
-        (min_score,),
-    ).fetchone()["cnt"]
+    # Recent scrape runs in last 24h — only the rows we render, plus the full count
+    runs = conn.execute(_SQL_RECENT_RUNS, (yesterday, MAX_RUNS_SHOWN)).fetchall()
 
     # Total stats
-    total = conn.execute("SELECT COUNT(*) as cnt FROM jobs").fetchone()["cnt"]
-    scored = conn.execute("SELECT COUNT(*) as cnt FROM jobs WHERE score IS NOT NULL").fetchone()["cnt"]
-    avg_score = conn.execute("SELECT AVG(score) as avg FROM jobs WHERE score IS NOT NULL").fetchone()["avg"]
-
-    # Top 5 freshest high-scoring jobs to apply to today
-    top5_today = conn.execute(
-        """SELECT * FROM jobs
-           WHERE score >= 60 AND status = 'new'
-           ORDER BY score DESC, created_at DESC LIMIT 5"""
-    ).fetchall()
-    top5_today = [dict(r) for r in top5_today]
+    total = conn.execute(_SQL_TOTAL).fetchone()["cnt"]
+    scored = conn.execute(_SQL_SCORED).fetchone()["cnt"]
+    avg_score = conn.execute(_SQL_AVG_SCORE).fetchone()["avg"]
 
     # Follow-ups due
     followups = get_followups_due(conn)
@@ -127,9 +155,53 @@ def get_digest_data():
         "avg_score": round(avg_score, 1) if avg_score else 0,
         "min_score": min_score,
         "settings": settings,
+        "now": now.astimezone(),  # local time for the header date
     }
 
 
+def is_quiet(data):
+    """True when the digest has no jobs, follow-ups, or runs to report."""
+    return not (data["new_jobs"] or data["top_matches"] or data["top5_today"]
+                or data["followups"] or data["runs"])
+
+
+def _score_color(s):
+    if s is None:
+        return "#666"
+    if s >= 80:
+        return "#4ade80"
+    if s >= 60:
+        return "#22d3ee"
+    if s >= 40:
+        return "#fbbf24"
+    return "#6b7280"
+
+
+def _score_bg(s):
+    if s is None:
+        return "rgba(107,114,128,0.12)"
+    if s >= 80:
+        return "rgba(74,222,128,0.15)"
+    if s >= 60:
+        return "rgba(34,211,238,0.15)"
+    if s >= 40:
+        return "rgba(251,191,36,0.15)"
+    return "rgba(107,114,128,0.12)"
+
+
+# (color, background) per score seen in the current digest — cleared by build_email
+_COLOR_CACHE = {}
+
+
+def _colors_for(s):
+    """Return the (color, background) badge pair for a score."""
+    pair = _COLOR_CACHE.get(s)
+    if pair is None:
+        pair = (_score_color(s), _score_bg(s))
+        _COLOR_CACHE[s] = pair
+    return pair
+
+
 def build_email(data):
     """Build the HTML email body."""
     new_jobs = data["new_jobs"]
@@ -137,31 +209,10 @@ def build_email(data):
     pipeline = data["pipeline"]
     runs = data["runs"]
 
-    # Score color helper
-    def score_color(s):
-        if s is None:
-            return "#666"
-        if s >= 80:
-            return "#4ade80"
-        if s >= 60:
-            return "#22d3ee"
-        if s >= 40:
-            return "#fbbf24"
-        return "#6b7280"
-
-    def score_bg(s):
-        if s is None:
-            return "rgba(107,114,128,0.12)"
-        if s >= 80:
-            return "rgba(74,222,128,0.15)"
-        if s >= 60:
-            return "rgba(34,211,238,0.15)"
-        if s >= 40:
-            return "rgba(251,191,36,0.15)"
-        return "rgba(107,114,128,0.12)"
+    _COLOR_CACHE.clear()
 
     # Header
-    html = f"""<!DOCTYPE html>
+    parts = [f"""<!DOCTYPE html>
 <html>
 <head><meta charset="UTF-8"></head>
 <body style="margin:0; padding:0; background:#0f1117; font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',sans-serif;">
@@ -173,10 +224,10 @@ def build_email(data):
             Job<span style="color:#22d3ee;">Hunter</span>3000
         </h1>
         <p style="margin:4px 0 0; font-size:13px; color:#666;">
-            Morning Briefing &mdash; {datetime.now().strftime('%A, %B %d, %Y')}
+            Morning Briefing &mdash; {data['now'].strftime('%A, %B %d, %Y')}
         </p>
     </div>
-"""
+"""]
 
     # Quick Stats Bar
     total_new = len(new_jobs)
@@ -185,7 +236,7 @@ def build_email(data):
     total_interviewing = pipeline.get("interviewing", 0)
     score_tiers = data.get("score_tiers", {})
     min_score = data.get("min_score", 40)
-    html += f"""
+    parts.append(f"""
     <!-- Quick Stats -->
     <div style="display:flex; justify-content:space-around; padding:16px 0; border-bottom:1px solid #2a2d3a;">
         <div style="text-align:center;">
@@ -238,94 +289,96 @@ def build_email(data):
             Showing jobs scoring {min_score}+ &middot; Change threshold in Settings
         </div>
     </div>
-"""
+""")
 
     # Top 5 to Apply To Today
     top5 = data.get("top5_today", [])
     if top5:
-        html += """
+        parts.append("""
     <!-- Top 5 Today -->
     <div style="padding:16px 0; border-bottom:1px solid #2a2d3a;">
         <h2 style="font-size:14px; color:#4ade80; text-transform:uppercase; letter-spacing:1px; margin:0 0 12px;">
             <span style="color:#22d3ee;">//</span> Top 5 to Apply To Today
         </h2>
         <p style="font-size:12px; color:#666; margin:0 0 10px;">These are your highest-scoring fresh jobs. Apply to these first.</p>
-"""
+""")
         for i, job in enumerate(top5, 1):
-            score = job.get("score", 0)
-            fit = job.get("fit_summary", "")
-            url = job.get("url", "")
-            html += f"""
+            score = job["score"]
+            color, bg = _colors_for(score)
+            fit = job["fit_summary"] or ""
+            url = job["url"] or ""
+            parts.append(f"""
         <div style="background:#1a1d27; border:1px solid #2a2d3a; border-radius:8px; padding:12px; margin-bottom:6px;">
             <div style="display:flex; align-items:center; gap:10px;">
                 <span style="display:inline-block; padding:3px 10px; font-size:14px; font-weight:700;
-                             border-radius:6px; background:{score_bg(score)}; color:{score_color(score)};">
+                             border-radius:6px; background:{bg}; color:{color};">
                     #{i} &middot; {score}
                 </span>
                 <div>
-                    <div style="font-size:14px; font-weight:600; color:#e0e0e0;">{job.get('title', 'Unknown')}</div>
-                    <div style="font-size:12px; color:#999;">{job.get('company', 'Unknown')} &middot; {job.get('location', '')}</div>
+                    <div style="font-size:14px; font-weight:600; color:#e0e0e0;">{job['title'] or 'Unknown'}</div>
+                    <div style="font-size:12px; color:#999;">{job['company'] or 'Unknown'} &middot; {job['location'] or ''}</div>
                 </div>
             </div>
             {f'<div style="font-size:12px; color:#999; margin-top:4px;">{fit}</div>' if fit else ''}
             {f'<div style="margin-top:4px;"><a href="{url}" style="font-size:12px; color:#22d3ee;">View Posting</a> &middot; <a href="{APP_URL}/jobs/{job["id"]}" style="font-size:12px; color:#22d3ee;">Open in JH3000</a></div>' if url else ''}
         </div>
-"""
-        html += "    </div>\n"
+""")
+        parts.append("    </div>\n")
 
     # Follow-ups Due
     followups = data.get("followups", [])
     if followups:
-        html += f"""
+        parts.append(f"""
     <!-- Follow-ups Due -->
     <div style="padding:16px 0; border-bottom:1px solid #2a2d3a;">
         <h2 style="font-size:14px; color:#fbbf24; text-transform:uppercase; letter-spacing:1px; margin:0 0 12px;">
             <span style="color:#22d3ee;">//</span> Follow-ups Due ({len(followups)})
         </h2>
-"""
+""")
         for fu in followups[:5]:
             days = fu.get("days_since_applied", 0)
             urgency_color = "#f87171" if days >= 14 else "#fbbf24"
             urgency_text = "2nd follow-up due" if days >= 14 else "Follow up now"
-            html += f"""
+            parts.append(f"""
         <div style="font-size:13px; color:#999; padding:6px 0; border-bottom:1px solid #1a1d27;">
             <span style="color:{urgency_color}; font-weight:600;">{days}d</span>
             &mdash; {fu.get('title', '?')} at {fu.get('company', '?')}
             <span style="color:{urgency_color}; font-size:11px;"> ({urgency_text})</span>
         </div>
-"""
+""")
         if len(followups) > 5:
-            html += f'        <div style="font-size:11px; color:#666; padding:6px 0;">+ {len(followups) - 5} more</div>\n'
-        html += "    </div>\n"
+            parts.append(f'        <div style="font-size:11px; color:#666; padding:6px 0;">+ {len(followups) - 5} more</div>\n')
+        parts.append("    </div>\n")
 
     # Top Matches section
     if top_matches:
-        html += """
+        parts.append("""
     <!-- Top Matches -->
     <div style="padding:16px 0;">
         <h2 style="font-size:14px; color:#e0e0e0; text-transform:uppercase; letter-spacing:1px; margin:0 0 12px;">
             <span style="color:#22d3ee;">//</span> Top Matches Awaiting Action
         </h2>
-"""
+""")
         for job in top_matches[:7]:
-            score = job.get("score", 0)
-            pros = json.loads(job.get("pros", "[]") or "[]")
-            fit = job.get("fit_summary", "")
-            url = job.get("url", "")
-            html += f"""
+            score = job["score"]
+            color, bg = _colors_for(score)
+            pros = json.loads(job["pros"] or "[]")
+            fit = job["fit_summary"] or ""
+            url = job["url"] or ""
+            parts.append(f"""
         <div style="background:#1a1d27; border:1px solid #2a2d3a; border-radius:8px; padding:14px; margin-bottom:8px;">
             <div style="display:flex; align-items:center; gap:10px; margin-bottom:6px;">
                 <span style="display:inline-block; padding:3px 10px; font-size:14px; font-weight:700;
-                             border-radius:6px; background:{score_bg(score)}; color:{score_color(score)};">
+                             border-radius:6px; background:{bg}; color:{color};">
                     {score}
                 </span>
                 <div>
                     <div style="font-size:15px; font-weight:600; color:#e0e0e0;">
-                        {job.get('title', 'Unknown')}
+                        {job['title'] or 'Unknown'}
                     </div>
                     <div style="font-size:13px; color:#999;">
-                        {job.get('company', 'Unknown')} &middot; {job.get('location', '')}
-                        {' &middot; ' + job.get('salary_text', '') if job.get('salary_text') else ''}
+                        {job['company'] or 'Unknown'} &middot; {job['location'] or ''}
+                        {' &middot; ' + job['salary_text'] if job['salary_text'] else ''}
                     </div>
                 </div>
             </div>
@@ -333,38 +386,41 @@ def build_email(data):
             {f'<div style="font-size:12px; color:#4ade80; margin-top:4px;">Pros: {"; ".join(pros[:3])}</div>' if pros else ''}
             {f'<div style="margin-top:6px;"><a href="{url}" style="font-size:12px; color:#22d3ee;">View Posting</a></div>' if url else ''}
         </div>
-"""
-        html += "    </div>\n"
+""")
+        parts.append("    </div>\n")
     else:
-        html += """
+        parts.append("""
     <div style="padding:20px 0; text-align:center; color:#666; font-size:14px;">
         No high-scoring matches awaiting action. Keep hunting!
     </div>
-"""
+""")
 
     # Scrape Run Summary
     if runs:
-        html += """
+        parts.append("""
     <!-- Recent Runs -->
     <div style="padding:16px 0; border-top:1px solid #2a2d3a;">
         <h2 style="font-size:14px; color:#e0e0e0; text-transform:uppercase; letter-spacing:1px; margin:0 0 12px;">
             <span style="color:#22d3ee;">//</span> Recon Activity (24h)
         </h2>
-"""
+""")
         for run in runs:
-            status_color = "#4ade80" if run.get("status") == "completed" else "#f87171"
-            html += f"""
+            status_color = "#4ade80" if run["status"] == "completed" else "#f87171"
+            parts.append(f"""
         <div style="font-size:13px; color:#999; padding:6px 0; border-bottom:1px solid #1a1d27;">
-            <span style="color:{status_color}; font-weight:600;">{run.get('status', '?').upper()}</span>
-            &mdash; Found {run.get('jobs_found', 0)} jobs, {run.get('jobs_new', 0)} new,
-            {run.get('jobs_scored', 0)} scored, {run.get('notifications_sent', 0)} notifications
-            {f" &mdash; {run.get('started_at', '')}" if run.get('started_at') else ''}
+            <span style="color:{status_color}; font-weight:600;">{(run['status'] or '?').upper()}</span>
+            &mdash; Found {run['jobs_found'] or 0} jobs, {run['jobs_new'] or 0} new,
+            {run['jobs_scored'] or 0} scored, {run['notifications_sent'] or 0} notifications
+            {f" &mdash; {run['started_at']}" if run['started_at'] else ''}
         </div>
-"""
-        html += "    </div>\n"
+""")
+        hidden_runs = runs[0]["total_runs"] - len(runs)
+        if hidden_runs > 0:
+            parts.append(f'        <div style="font-size:11px; color:#666; padding:6px 0;">+ {hidden_runs} more</div>\n')
+        parts.append("    </div>\n")
 
     # Pipeline Summary
-    html += f"""
+    parts.append(f"""
     <!-- Pipeline -->
     <div style="padding:16px 0; border-top:1px solid #2a2d3a;">
         <h2 style="font-size:14px; color:#e0e0e0; text-transform:uppercase; letter-spacing:1px; margin:0 0 12px;">
@@ -382,10 +438,10 @@ def build_email(data):
             {data['total_jobs']} total jobs tracked &middot; {data['total_scored']} scored &middot; Avg score: {data['avg_score']}
         </div>
     </div>
-"""
+""")
 
     # Footer with link
-    html += f"""
+    parts.append(f"""
     <!-- Footer -->
     <div style="padding:16px 0; border-top:1px solid #2a2d3a; text-align:center;">
         <a href="{APP_URL}/dashboard" style="display:inline-block; padding:10px 24px; background:#22d3ee;
@@ -399,30 +455,40 @@ def build_email(data):
 
 </div>
 </body>
-</html>"""
+</html>""")
 
-    return html
+    return "".join(parts)
 
 
 def send_email(subject, html):
-    """Send HTML email via msmtp."""
+    """Send HTML email via msmtp.
+
+    All recipients go on a single msmtp command line so one SMTP session
+    (one handshake/auth) delivers to every RCPT TO.
+    """
+    recipients = [r.strip() for r in EMAIL_TO.split(",") if r.strip()]
+    if not recipients:
+        print("Email error: JH3000_EMAIL_TO is not set", file=sys.stderr)
+        return
+
     msg = MIMEMultipart("related")
     msg["From"] = EMAIL_FROM
-    msg["To"] = EMAIL_TO
+    msg["To"] = ", ".join(recipients)
     msg["Subject"] = subject
 
     msg.attach(MIMEText(html, "html"))
 
-    raw = msg.as_string()
     try:
+        # run() writes the input inside communicate(), so the timeout covers the
+        # write too, and it kills msmtp before raising TimeoutExpired
         proc = subprocess.run(
-            ["msmtp", "-a", "gmail", EMAIL_TO],
-            input=raw, capture_output=True, text=True, timeout=30,
+            ["msmtp", "-a", "gmail", *recipients],
+            input=msg.as_bytes(), capture_output=True, timeout=30,
         )
         if proc.returncode != 0:
-            print(f"Email send failed: {proc.stderr}", file=sys.stderr)
+            print(f"Email send failed: {proc.stderr.decode(errors='replace')}", file=sys.stderr)
         else:
-            print(f"Digest email sent to {EMAIL_TO}")
+            print(f"Digest email sent to {', '.join(recipients)}")
     except Exception as e:
         print(f"Email error: {e}", file=sys.stderr)
 
@@ -440,7 +506,7 @@ def main():
 
     # Build subject line with key stats
     new_count = len(data["new_jobs"])
-    top_score = max((j.get("score", 0) for j in data["top_matches"]), default=0)
+    top_score = max((j["score"] or 0 for j in data["top_matches"]), default=0)
     awaiting = data["awaiting_action"]
     tiers = data.get("score_tiers", {})
     hot = tiers.get("80+", 0)
@@ -454,7 +520,14 @@ def main():
     else:
         subject = f"JH3000: Morning briefing | {awaiting} awaiting review"
 
-    html = build_email(data)
+    if is_quiet(data):
+        html = QUIET_BODY.format(
+            date=data["now"].strftime('%A, %B %d, %Y'),
+            awaiting=awaiting,
+            app_url=APP_URL,
+        )
+    else:
+        html = build_email(data)
     send_email(subject, html)
 
     print(f"[{datetime.now().isoformat()}] Digest complete.")
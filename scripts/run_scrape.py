@@ -14,6 +14,7 @@ import json
 import logging
 import os
 import sys
+from datetime import datetime, timezone
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
@@ -31,6 +32,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger("jobhunter3000.pipeline")
 
+# ── SQL ───────────────────────────────────────────────────
+# Module-level so repeated executions reuse the connection's prepared-statement cache.
+_SQL_START_RUN = "INSERT INTO scrape_runs (started_at, status) VALUES (?, 'running')"
+# Only the fields notify_job_match reads; NULL pros/cons normalized in SQL
+_SQL_PENDING_NOTIFY = """SELECT id, title, company, location, salary_text, url, score, fit_summary,
+          COALESCE(pros, '[]') AS pros, COALESCE(cons, '[]') AS cons
+   FROM jobs WHERE score >= ? AND notified = 0"""
+_SQL_MARK_NOTIFIED = "UPDATE jobs SET notified = 1 WHERE id = ?"
+_SQL_FINISH_RUN = """UPDATE scrape_runs SET
+   completed_at = ?,
+   jobs_found = ?, jobs_new = ?, jobs_scored = ?,
+   notifications_sent = ?, status = ?, error = ?
+   WHERE id = ?"""
+
 
 def main():
     settings = load_settings()
@@ -44,11 +59,10 @@ def main():
     logger.info("JobHunter3000 pipeline starting")
     logger.info("=" * 60)
 
-    # 1. Record the run
+    # 1. Record the run (UTC 'YYYY-MM-DD HH:MM:SS', matching the app's datetime('now') rows)
+    started_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
     conn = get_db()
-    cursor = conn.execute(
-        "INSERT INTO scrape_runs (started_at, status) VALUES (datetime('now'), 'running')"
-    )
+    cursor = conn.execute(_SQL_START_RUN, (started_at,))
     run_id = cursor.lastrowid
     conn.commit()
     conn.close()
@@ -91,24 +105,19 @@ def main():
     try:
         conn = get_db()
         threshold = settings.get("notify_threshold", 60)
-        rows = conn.execute(
-            "SELECT * FROM jobs WHERE score >= ? AND notified = 0",
-            (threshold,),
-        ).fetchall()
+        rows = conn.execute(_SQL_PENDING_NOTIFY, (threshold,)).fetchall()
 
         for row in rows:
             job = dict(row)
             score_data = {
-                "score": job.get("score", 0),
-                "pros": json.loads(job.get("pros", "[]") or "[]"),
-                "cons": json.loads(job.get("cons", "[]") or "[]"),
-                "fit_summary": job.get("fit_summary", ""),
+                "score": job["score"],
+                "pros": json.loads(job["pros"]),
+                "cons": json.loads(job["cons"]),
+                "fit_summary": job["fit_summary"] or "",
             }
             result = notify_job_match(job, score_data, settings)
             if result.get("ok"):
-                conn.execute(
-                    "UPDATE jobs SET notified = 1 WHERE id = ?", (job["id"],)
-                )
+                conn.execute(_SQL_MARK_NOTIFIED, (job["id"],))
                 conn.commit()
                 notified_count += 1
                 logger.info(
@@ -124,14 +133,12 @@ def main():
 
     # 5. Update run record
     status = "error" if errors else "completed"
+    completed_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
     conn = get_db()
     conn.execute(
-        """UPDATE scrape_runs SET
-           completed_at = datetime('now'),
-           jobs_found = ?, jobs_new = ?, jobs_scored = ?,
-           notifications_sent = ?, status = ?, error = ?
-           WHERE id = ?""",
+        _SQL_FINISH_RUN,
         (
+            completed_at,
             scrape_results.get("jobs_found", 0),
             scrape_results.get("jobs_new", 0),
             scored_count,
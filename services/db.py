@@ -5,6 +5,8 @@ SQLite database — schema, connection, queries.
 import json
 import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "jobs.db")
@@ -71,22 +73,128 @@ CREATE TABLE IF NOT EXISTS scrape_runs (
     error TEXT
 );
 
-CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
 CREATE INDEX IF NOT EXISTS idx_jobs_score ON jobs(score DESC);
-CREATE INDEX IF NOT EXISTS idx_jobs_source ON jobs(source);
 CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company);
-CREATE INDEX IF NOT EXISTS idx_jobs_url ON jobs(url);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_score ON jobs(created_at, score);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON scrape_runs(started_at DESC);
+
+-- Completed LLM requests (services/llm_cache.py), keyed by SHA-256 of provider/model/messages
+CREATE TABLE IF NOT EXISTS llm_cache (
+    prompt_hash TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at TEXT DEFAULT (datetime('now'))
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at);
+
+-- Per-status job counts, kept current by triggers so the dashboard never scans jobs
+CREATE TABLE IF NOT EXISTS dashboard_stats (
+    status TEXT PRIMARY KEY,
+    cnt INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Triggers that keep dashboard_stats current. Created (and the counts seeded)
+# by _ensure_dashboard_stats rather than SCHEMA, so both happen in one transaction.
+DASHBOARD_STATS_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_jobs_stats_ai AFTER INSERT ON jobs
+WHEN NEW.status IS NOT NULL
+BEGIN
+    INSERT INTO dashboard_stats (status, cnt) VALUES (NEW.status, 1)
+    ON CONFLICT(status) DO UPDATE SET cnt = cnt + 1;
+END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_jobs_stats_au AFTER UPDATE OF status ON jobs
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+    UPDATE dashboard_stats SET cnt = cnt - 1 WHERE status = OLD.status;
+    INSERT INTO dashboard_stats (status, cnt) SELECT NEW.status, 1 WHERE NEW.status IS NOT NULL
+    ON CONFLICT(status) DO UPDATE SET cnt = cnt + 1;
+END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_jobs_stats_ad AFTER DELETE ON jobs
+WHEN OLD.status IS NOT NULL
+BEGIN
+    UPDATE dashboard_stats SET cnt = cnt - 1 WHERE status = OLD.status;
+END""",
+]
+
+# Columns the job list and pipeline views render — keeps description and
+# score_details blobs out of list queries. Detail views use get_job(); the
+# /api/jobs endpoint asks get_jobs for full rows.
+JOB_LIST_COLUMNS = (
+    "id, title, company, location, source, status, score, salary_text, "
+    "created_at, applied_date, url, is_favorite, search_query"
+)
+
+
+# Per-connection settings (these reset on every open)
+CONNECTION_PRAGMAS = """
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-65536;
+PRAGMA busy_timeout=5000;
 """
 
+# journal_mode=WAL is stored in the database file, so it only needs setting once per path
+_wal_paths = set()
+
 
 def get_db(db_path: str = None) -> sqlite3.Connection:
-    """Get a database connection with Row factory."""
+    """Get a database connection with Row factory and tuned PRAGMAs."""
     path = db_path or DB_PATH
-    conn = sqlite3.connect(path)
+    # Room in the prepared-statement cache for the whole app's statement set
+    conn = sqlite3.connect(path, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    if path not in _wal_paths:
+        # WAL lets dashboard reads proceed while a scrape/score run is writing
+        conn.execute("PRAGMA journal_mode=WAL")
+        _wal_paths.add(path)
+    # NORMAL sync + 64MB page cache + 256MB mmap so repeated scans of jobs stay in memory
+    conn.executescript(CONNECTION_PRAGMAS)
     return conn
 
 
+# Connections (by id) currently inside a batch() span on this thread
+_batch_state = threading.local()
+
+
+def _in_batch(conn: sqlite3.Connection) -> bool:
+    """Whether conn is inside a batch() span on this thread."""
+    return id(conn) in getattr(_batch_state, "conns", ())
+
+
+@contextmanager
+def batch(conn: sqlite3.Connection):
+    """Group the writes inside the block into one transaction with a single commit.
+
+    The write helpers below skip their own commit while a batch is open on
+    their connection. Nested batches join the outer one. Rolls back on error.
+    """
+    if _in_batch(conn):
+        yield conn
+        return
+    if not hasattr(_batch_state, "conns"):
+        _batch_state.conns = set()
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    _batch_state.conns.add(id(conn))
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+    finally:
+        _batch_state.conns.discard(id(conn))
+
+
+def _commit(conn: sqlite3.Connection):
+    """Commit unless the connection is inside a batch() span."""
+    if not _in_batch(conn):
+        conn.commit()
+
+
 def _run_migrations(conn: sqlite3.Connection):
     """Run all column migrations (idempotent)."""
     cols = {r[1] for r in conn.execute("PRAGMA table_info(jobs)").fetchall()}
@@ -102,7 +210,66 @@ def _run_migrations(conn: sqlite3.Connection):
     for col, sql in migrations.items():
         if col not in cols:
             conn.execute(sql)
+
+    # Upload hash: re-uploading an identical file reuses its extracted text
+    resume_cols = {r[1] for r in conn.execute("PRAGMA table_info(resumes)").fetchall()}
+    if "content_sha256" not in resume_cols:
+        conn.execute("ALTER TABLE resumes ADD COLUMN content_sha256 TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_resumes_sha256 ON resumes(content_sha256)")
+
+    # Unique URL index lets bulk inserts dedup with ON CONFLICT DO NOTHING. Replaces the
+    # old plain idx_jobs_url; legacy databases with colliding URLs keep the old one.
+    try:
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_url_unique ON jobs(url) "
+            "WHERE url IS NOT NULL AND url != ''"
+        )
+        conn.execute("DROP INDEX IF EXISTS idx_jobs_url")
+    except sqlite3.IntegrityError:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_url ON jobs(url)")
+
+    # Composite indices for get_jobs: equality column first, then its ORDER BY
+    # (which always leads with is_favorite), so filtered list pages read rows in
+    # order instead of sorting into a temp B-tree. They supersede the plain
+    # status/source indices. Created here because is_favorite is a migrated column.
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, is_favorite DESC, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_jobs_status_score ON jobs(status, is_favorite DESC, score DESC);
+        CREATE INDEX IF NOT EXISTS idx_jobs_source_created ON jobs(source, is_favorite DESC, created_at DESC);
+        DROP INDEX IF EXISTS idx_jobs_status;
+        DROP INDEX IF EXISTS idx_jobs_source;
+    """)
+
     conn.commit()
+    _ensure_dashboard_stats(conn)
+
+
+def _ensure_dashboard_stats(conn: sqlite3.Connection):
+    """Create the dashboard_stats triggers and seed the counts from jobs, atomically.
+
+    BEGIN IMMEDIATE holds the write lock from the trigger check through the seed,
+    so a job inserted by another connection can't be missed or counted twice.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        existing = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_jobs_stats_%'"
+        ).fetchone()[0]
+        if existing < len(DASHBOARD_STATS_TRIGGERS):
+            for sql in DASHBOARD_STATS_TRIGGERS:
+                conn.execute(sql)
+            conn.execute("DELETE FROM dashboard_stats")
+            conn.execute(
+                "INSERT INTO dashboard_stats (status, cnt) "
+                "SELECT status, COUNT(*) FROM jobs WHERE status IS NOT NULL GROUP BY status"
+            )
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
 
 
 def ensure_tables(conn: sqlite3.Connection):
@@ -114,8 +281,9 @@ def ensure_tables(conn: sqlite3.Connection):
 
 def get_pipeline_counts(conn: sqlite3.Connection) -> dict:
     """Get count of jobs by status."""
+    # Read the trigger-maintained table rather than grouping over jobs
     rows = conn.execute(
-        "SELECT status, COUNT(*) as cnt FROM jobs GROUP BY status"
+        "SELECT status, cnt FROM dashboard_stats WHERE cnt > 0"
     ).fetchall()
     counts = {row["status"]: row["cnt"] for row in rows}
     return counts
@@ -123,19 +291,18 @@ def get_pipeline_counts(conn: sqlite3.Connection) -> dict:
 
 def get_dashboard_stats(conn: sqlite3.Connection) -> dict:
     """Get aggregate stats for the dashboard."""
-    total = conn.execute("SELECT COUNT(*) as c FROM jobs").fetchone()["c"]
-    applied = conn.execute(
-        "SELECT COUNT(*) as c FROM jobs WHERE status IN ('applied', 'interviewing', 'offer', 'accepted')"
-    ).fetchone()["c"]
-    interviewing = conn.execute(
-        "SELECT COUNT(*) as c FROM jobs WHERE status IN ('interviewing', 'offer', 'accepted')"
-    ).fetchone()["c"]
-    rejected = conn.execute(
-        "SELECT COUNT(*) as c FROM jobs WHERE status = 'rejected'"
-    ).fetchone()["c"]
-    active = conn.execute(
-        "SELECT COUNT(*) as c FROM jobs WHERE status IN ('interested', 'applied', 'interviewing')"
-    ).fetchone()["c"]
+    # All status counters derive from the per-status rows in dashboard_stats, which
+    # the trg_jobs_stats_* triggers keep current, so no query scans jobs
+    pipeline_counts = get_pipeline_counts(conn)
+
+    def _sum(*statuses):
+        return sum(pipeline_counts.get(st, 0) for st in statuses)
+
+    total = sum(pipeline_counts.values())
+    applied = _sum("applied", "interviewing", "offer", "accepted")
+    interviewing = _sum("interviewing", "offer", "accepted")
+    rejected = _sum("rejected")
+    active = _sum("interested", "applied", "interviewing")
 
     # Response rate: (interviewing + offer + accepted) / applied
     response_rate = 0
@@ -161,7 +328,7 @@ def get_dashboard_stats(conn: sqlite3.Connection) -> dict:
         "response_rate": response_rate,
         "top_job": dict(top_job) if top_job else None,
         "recent": [dict(r) for r in recent],
-        "pipeline_counts": get_pipeline_counts(conn),
+        "pipeline_counts": pipeline_counts,
     }
 
 
@@ -169,8 +336,9 @@ def get_jobs(conn: sqlite3.Connection, status: str = None, source: str = None,
              sort: str = "created_at", order: str = "desc",
              limit: int = 100, offset: int = 0,
              min_score: int = None, search_query: str = None,
-             max_age_hours: int = None, favorites_only: bool = False) -> list[dict]:
-    """Get paginated job list with optional filters."""
+             max_age_hours: int = None, favorites_only: bool = False,
+             columns: str = JOB_LIST_COLUMNS) -> list[dict]:
+    """Get paginated job list with optional filters. Pass columns="*" for full rows."""
     where_parts = []
     params = []
 
@@ -213,7 +381,7 @@ def get_jobs(conn: sqlite3.Connection, status: str = None, source: str = None,
         order_clause = f"is_favorite DESC, {sort} {order}"
 
     query = f"""
-        SELECT * FROM jobs
+        SELECT {columns} FROM jobs
         WHERE {where_clause}
         ORDER BY {order_clause}
         LIMIT ? OFFSET ?
@@ -230,34 +398,42 @@ def get_job(conn: sqlite3.Connection, job_id: int) -> dict | None:
     return dict(row) if row else None
 
 
+# Constant SQL so every status change reuses one cached prepared statement
+_SQL_UPDATE_STATUS = """
+    UPDATE jobs SET status = ?, updated_at = ?, applied_date = COALESCE(?, applied_date)
+    WHERE id = ?
+"""
+
+
 def update_job_status(conn: sqlite3.Connection, job_id: int, new_status: str) -> bool:
     """Update a job's status."""
     valid_statuses = {"new", "interested", "applied", "interviewing", "rejected", "offer", "accepted", "archived"}
     if new_status not in valid_statuses:
         return False
 
-    updates = {"status": new_status, "updated_at": datetime.now().isoformat()}
-    if new_status == "applied":
-        updates["applied_date"] = datetime.now().isoformat()
-
-    set_clause = ", ".join(f"{k} = ?" for k in updates)
-    params = list(updates.values()) + [job_id]
-    conn.execute(f"UPDATE jobs SET {set_clause} WHERE id = ?", params)
-    conn.commit()
+    now = datetime.now().isoformat()
+    applied_date = now if new_status == "applied" else None
+    conn.execute(_SQL_UPDATE_STATUS, (new_status, now, applied_date, job_id))
+    _commit(conn)
     return True
 
 
+# Columns update_job may write, in the fixed order used to build its SET clause
+UPDATABLE_COLUMNS = (
+    "title", "company", "location", "industry", "url", "description",
+    "salary_text", "salary_min", "salary_max", "status", "notes",
+    "resume_used", "resume_path", "cover_letter_path",
+    "contact_name", "contact_email", "contact_title",
+    "score", "score_details", "pros", "cons", "fit_summary",
+    "applied_date", "followed_up_at", "is_favorite",
+)
+
+
 def update_job(conn: sqlite3.Connection, job_id: int, data: dict) -> bool:
     """Update arbitrary fields on a job."""
-    allowed = {
-        "title", "company", "location", "industry", "url", "description",
-        "salary_text", "salary_min", "salary_max", "status", "notes",
-        "resume_used", "resume_path", "cover_letter_path",
-        "contact_name", "contact_email", "contact_title",
-        "score", "score_details", "pros", "cons", "fit_summary",
-        "applied_date", "followed_up_at", "is_favorite",
-    }
-    to_update = {k: v for k, v in data.items() if k in allowed}
+    # Canonical column order: the same set of fields always produces the same SQL
+    # text, so repeat updates hit the connection's prepared-statement cache
+    to_update = {k: data[k] for k in UPDATABLE_COLUMNS if k in data}
     if not to_update:
         return False
 
@@ -265,7 +441,7 @@ def update_job(conn: sqlite3.Connection, job_id: int, data: dict) -> bool:
     set_clause = ", ".join(f"{k} = ?" for k in to_update)
     params = list(to_update.values()) + [job_id]
     conn.execute(f"UPDATE jobs SET {set_clause} WHERE id = ?", params)
-    conn.commit()
+    _commit(conn)
     return True
 
 
@@ -286,8 +462,8 @@ def _normalize_url(url: str) -> str:
         return url
 
 
-def upsert_job(conn: sqlite3.Connection, job_data: dict) -> int:
-    """Insert a job, or skip if it's a duplicate. Returns job ID or -1 if skipped.
+def _is_duplicate(conn: sqlite3.Connection, job_data: dict) -> bool:
+    """Check whether a job already exists.
 
     Dedup strategy:
     1. Exact URL match (after stripping tracking params)
@@ -300,31 +476,66 @@ def upsert_job(conn: sqlite3.Connection, job_data: dict) -> int:
     # Check 1: URL match (normalized)
     if url:
         norm_url = _normalize_url(url)
-        existing = conn.execute(
-            "SELECT id FROM jobs WHERE url = ? OR url = ?", (url, norm_url)
-        ).fetchone()
-        if existing:
-            return -1
+        # url != '' repeats the partial unique index's condition so the lookup can use it
+        if conn.execute(
+            "SELECT EXISTS(SELECT 1 FROM jobs WHERE url IN (?, ?) AND url != '')", (url, norm_url)
+        ).fetchone()[0]:
+            return True
 
     # Check 2: Title + company match (case-insensitive, trimmed)
     if title and company:
-        existing = conn.execute(
-            "SELECT id FROM jobs WHERE LOWER(TRIM(title)) = LOWER(?) AND LOWER(TRIM(company)) = LOWER(?)",
+        if conn.execute(
+            "SELECT EXISTS(SELECT 1 FROM jobs WHERE LOWER(TRIM(title)) = LOWER(?) "
+            "AND LOWER(TRIM(company)) = LOWER(?))",
             (title, company)
-        ).fetchone()
-        if existing:
-            return -1
+        ).fetchone()[0]:
+            return True
+
+    return False
+
+
+def _insert_job(conn: sqlite3.Connection, job_data: dict) -> int:
+    """Insert one job row (no commit). Returns the new ID, or -1 on a duplicate URL.
 
+    ON CONFLICT DO NOTHING only absorbs uniqueness conflicts; NOT NULL and other
+    constraint violations still raise, unlike INSERT OR IGNORE.
+    """
     cols = [k for k in job_data if job_data[k] is not None]
     placeholders = ", ".join("?" for _ in cols)
     col_names = ", ".join(cols)
     values = [job_data[k] for k in cols]
 
     cursor = conn.execute(
-        f"INSERT INTO jobs ({col_names}) VALUES ({placeholders})", values
+        f"INSERT INTO jobs ({col_names}) VALUES ({placeholders}) ON CONFLICT DO NOTHING",
+        values,
     )
-    conn.commit()
-    return cursor.lastrowid
+    return cursor.lastrowid if cursor.rowcount > 0 else -1
+
+
+def upsert_job(conn: sqlite3.Connection, job_data: dict) -> int:
+    """Insert a job, or skip if it's a duplicate. Returns job ID or -1 if skipped."""
+    if _is_duplicate(conn, job_data):
+        return -1
+    job_id = _insert_job(conn, job_data)
+    _commit(conn)
+    return job_id
+
+
+def upsert_jobs_bulk(conn: sqlite3.Connection, jobs: list[dict]) -> int:
+    """Insert many jobs in a single transaction, skipping duplicates. Returns count inserted.
+
+    Same dedup rules as upsert_job. Rows are checked and inserted one at a time
+    inside the transaction, so duplicates within the batch are caught too; the
+    whole batch pays for one commit instead of one per job.
+    """
+    inserted = 0
+    with batch(conn):
+        for job_data in jobs:
+            if _is_duplicate(conn, job_data):
+                continue
+            if _insert_job(conn, job_data) > 0:
+                inserted += 1
+    return inserted
 
 
 def bulk_update_status(conn: sqlite3.Connection, job_ids: list[int], new_status: str) -> int:
@@ -340,7 +551,7 @@ def bulk_update_status(conn: sqlite3.Connection, job_ids: list[int], new_status:
         f"UPDATE jobs SET status = ?, updated_at = ? WHERE id IN ({placeholders})",
         params,
     )
-    conn.commit()
+    _commit(conn)
     return cursor.rowcount
 
 
@@ -0,0 +1,57 @@
+"""
+Read-only SQLite connection pool — reused connections for page and API reads.
+"""
+
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from services.db import CONNECTION_PRAGMAS, DB_PATH
+
+POOL_SIZE = 2 * (os.cpu_count() or 2)
+
+_pool = queue.LifoQueue()
+_opened = 0
+_lock = threading.Lock()
+
+
+def _open_read_conn(db_path: str) -> sqlite3.Connection:
+    """Open a read-only connection. Shared across request threads, so no same-thread check."""
+    uri = pathlib.Path(db_path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(CONNECTION_PRAGMAS + "PRAGMA query_only=1;\n")
+    return conn
+
+
+@contextmanager
+def read_conn():
+    """Borrow a pooled read-only connection; returned to the pool on exit.
+
+    Connections are opened lazily up to POOL_SIZE; past that, callers wait
+    for one to come back. Under WAL, pooled readers never block the writer.
+    """
+    global _opened
+    try:
+        conn = _pool.get_nowait()
+    except queue.Empty:
+        with _lock:
+            can_open = _opened < POOL_SIZE
+            if can_open:
+                _opened += 1
+        if can_open:
+            try:
+                conn = _open_read_conn(DB_PATH)
+            except Exception:
+                with _lock:
+                    _opened -= 1
+                raise
+        else:
+            conn = _pool.get()
+    try:
+        yield conn
+    finally:
+        _pool.put(conn)
@@ -3,247 +3,133 @@ Resume & cover letter generation — tailored to specific job postings using LLM
 """
 
 import json
+import multiprocessing
 import os
 import re
 import sqlite3
-from docx import Document
-from docx.shared import Pt, Inches, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from fpdf import FPDF
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from services.db import batch, get_db
 from services.llm import llm_chat
+from services.render import md_to_docx, md_to_pdf
 from services.resumes import load_candidate_profile
 from services.settings import load_settings
 
 GENERATED_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "generated")
 
+# Words of 4+ letters — the unit resume tags are matched against job text in
+_TAG_WORD_RE = re.compile(r"[a-z]{4,}")
 
-def _md_to_docx(markdown: str, output_path: str, doc_type: str = "resume"):
-    """Convert markdown text to a clean .docx file."""
-    doc = Document()
-
-    # Set default font
-    style = doc.styles["Normal"]
-    font = style.font
-    font.name = "Calibri"
-    font.size = Pt(11)
-    font.color.rgb = RGBColor(0x33, 0x33, 0x33)
-
-    # Tighter paragraph spacing
-    style.paragraph_format.space_after = Pt(4)
-    style.paragraph_format.space_before = Pt(0)
-
-    # Set narrow margins
-    for section in doc.sections:
-        section.top_margin = Inches(0.6)
-        section.bottom_margin = Inches(0.6)
-        section.left_margin = Inches(0.75)
-        section.right_margin = Inches(0.75)
-
-    lines = markdown.split("\n")
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        stripped = line.strip()
-
-        # Skip empty lines
-        if not stripped:
-            i += 1
-            continue
-
-        # Horizontal rule → thin line (skip it, just adds spacing)
-        if stripped in ("---", "***", "___"):
-            i += 1
-            continue
-
-        # H1: # Header
-        if stripped.startswith("# ") and not stripped.startswith("## "):
-            text = stripped[2:].strip()
-            text = re.sub(r"\*\*(.+?)\*\*", r"\1", text)  # strip bold markers
-            p = doc.add_paragraph()
-            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            run = p.add_run(text)
-            run.bold = True
-            run.font.size = Pt(16)
-            run.font.color.rgb = RGBColor(0x1a, 0x1a, 0x1a)
-            p.paragraph_format.space_after = Pt(2)
-            i += 1
-            continue
-
-        # H2: ## Section Header
-        if stripped.startswith("## "):
-            text = stripped[3:].strip()
-            text = re.sub(r"\*\*(.+?)\*\*", r"\1", text)
-            p = doc.add_paragraph()
-            run = p.add_run(text.upper())
-            run.bold = True
-            run.font.size = Pt(12)
-            run.font.color.rgb = RGBColor(0x1a, 0x56, 0x8a)
-            p.paragraph_format.space_before = Pt(10)
-            p.paragraph_format.space_after = Pt(3)
-            # Add a bottom border
-            from docx.oxml.ns import qn
-            pPr = p._p.get_or_add_pPr()
-            pBdr = pPr.makeelement(qn("w:pBdr"), {})
-            bottom = pBdr.makeelement(qn("w:bottom"), {
-                qn("w:val"): "single",
-                qn("w:sz"): "4",
-                qn("w:space"): "1",
-                qn("w:color"): "1a568a",
-            })
-            pBdr.append(bottom)
-            pPr.append(pBdr)
-            i += 1
-            continue
-
-        # H3: ### Sub-header
-        if stripped.startswith("### "):
-            text = stripped[4:].strip()
-            text = re.sub(r"\*\*(.+?)\*\*", r"\1", text)
-            p = doc.add_paragraph()
-            run = p.add_run(text)
-            run.bold = True
-            run.font.size = Pt(11)
-            p.paragraph_format.space_before = Pt(6)
-            p.paragraph_format.space_after = Pt(2)
-            i += 1
-            continue
-
-        # Bullet point: - text or * text
-        if re.match(r"^[-*]\s", stripped):
-            text = stripped[2:].strip()
-            p = doc.add_paragraph(style="List Bullet")
-            _add_formatted_text(p, text)
-            p.paragraph_format.space_after = Pt(1)
-            p.paragraph_format.left_indent = Inches(0.25)
-            i += 1
-            continue
-
-        # Regular paragraph (handle bold/italic inline)
-        p = doc.add_paragraph()
-        _add_formatted_text(p, stripped)
-        # Center lines that look like contact info (short, contain | or email)
-        if len(stripped) < 120 and ("|" in stripped or "@" in stripped):
-            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            p.paragraph_format.space_after = Pt(1)
-        i += 1
-
-    doc.save(output_path)
-
-
-def _add_formatted_text(paragraph, text):
-    """Add text to a paragraph, handling **bold** and *italic* markers."""
-    # Split on bold markers first
-    parts = re.split(r"(\*\*[^*]+?\*\*)", text)
-    for part in parts:
-        if part.startswith("**") and part.endswith("**"):
-            run = paragraph.add_run(part[2:-2])
-            run.bold = True
-        elif "*" in part:
-            # Handle italic within non-bold segments
-            sub_parts = re.split(r"(\*[^*]+?\*)", part)
-            for sp in sub_parts:
-                if sp.startswith("*") and sp.endswith("*"):
-                    run = paragraph.add_run(sp[1:-1])
-                    run.italic = True
-                else:
-                    if sp:
-                        paragraph.add_run(sp)
-        else:
-            if part:
-                paragraph.add_run(part)
-
-
-def _md_to_pdf(markdown: str, output_path: str):
-    """Convert markdown text to a clean PDF file."""
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=20)
-    pdf.add_page()
-    pdf.set_margins(20, 15, 20)
-
-    lines = markdown.split("\n")
-    for line in lines:
-        stripped = line.strip()
-
-        # Skip empty lines — add small spacing
-        if not stripped:
-            pdf.ln(3)
-            continue
-
-        # Horizontal rule
-        if stripped in ("---", "***", "___"):
-            y = pdf.get_y()
-            pdf.set_draw_color(180, 180, 180)
-            pdf.line(20, y, 190, y)
-            pdf.ln(3)
-            continue
-
-        # Strip bold/italic markers for PDF (fpdf2 doesn't do inline mixed easily)
-        clean = re.sub(r"\*\*(.+?)\*\*", r"\1", stripped)
-        clean = re.sub(r"\*(.+?)\*", r"\1", clean)
-
-        # H1
-        if stripped.startswith("# ") and not stripped.startswith("## "):
-            text = re.sub(r"\*\*(.+?)\*\*", r"\1", stripped[2:].strip())
-            pdf.set_font("Helvetica", "B", 16)
-            pdf.set_text_color(26, 26, 26)
-            pdf.cell(0, 8, text, align="C", new_x="LMARGIN", new_y="NEXT")
-            pdf.ln(1)
-            continue
-
-        # H2
-        if stripped.startswith("## "):
-            text = re.sub(r"\*\*(.+?)\*\*", r"\1", stripped[3:].strip())
-            pdf.ln(3)
-            pdf.set_font("Helvetica", "B", 12)
-            pdf.set_text_color(26, 86, 138)
-            pdf.cell(0, 7, text.upper(), new_x="LMARGIN", new_y="NEXT")
-            # Underline
-            y = pdf.get_y()
-            pdf.set_draw_color(26, 86, 138)
-            pdf.line(20, y, 190, y)
-            pdf.ln(2)
-            continue
-
-        # H3
-        if stripped.startswith("### "):
-            text = re.sub(r"\*\*(.+?)\*\*", r"\1", stripped[4:].strip())
-            pdf.ln(2)
-            pdf.set_font("Helvetica", "B", 11)
-            pdf.set_text_color(51, 51, 51)
-            pdf.cell(0, 6, text, new_x="LMARGIN", new_y="NEXT")
-            pdf.ln(1)
-            continue
-
-        # Bullet point
-        if re.match(r"^[-*]\s", stripped):
-            text = clean[2:].strip()
-            pdf.set_font("Helvetica", "", 10)
-            pdf.set_text_color(51, 51, 51)
-            x = pdf.get_x()
-            pdf.cell(8, 5, chr(8226), new_x="END")  # bullet char
-            pdf.multi_cell(0, 5, text, new_x="LMARGIN", new_y="NEXT")
-            continue
-
-        # Regular paragraph
-        pdf.set_font("Helvetica", "", 10)
-        pdf.set_text_color(51, 51, 51)
-        # Center contact-like lines
-        if len(clean) < 120 and ("|" in clean or "@" in clean):
-            pdf.cell(0, 5, clean, align="C", new_x="LMARGIN", new_y="NEXT")
-        else:
-            pdf.multi_cell(0, 5, clean, new_x="LMARGIN", new_y="NEXT")
-
-    pdf.output(output_path)
 
+# DOCX and PDF rendering is CPU-bound and independent, so the two run in
+# separate processes. Spawned (not forked) because callers run in server threads;
+# workers only import services.render, not this module's LLM/DB stack.
+_render_pool = None
+_render_pool_lock = threading.Lock()
 
-def _pick_best_resume(job: dict) -> tuple[str, str]:
-    """Pick the best-matching uploaded resume for a job.
 
-    Compares each resume's best_for tags against the job title/description.
-    Returns (content_text, original_name) of the best match.
-    Falls back to the longest resume if no tag matches.
+def _get_render_pool() -> ProcessPoolExecutor:
+    """Return the shared render pool, starting it on first use."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=2, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _render_pool
+
+
+def _drop_render_pool(pool: ProcessPoolExecutor):
+    """Shut down a broken pool and forget it, unless another thread already replaced it."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_documents(markdown: str, docx_path: str, pdf_path: str, doc_type: str):
+    """Write the DOCX and PDF versions of a document in parallel.
+
+    DOCX errors propagate; PDF is optional — Unicode font issues shouldn't block generation.
     """
+    pool = _get_render_pool()
+    try:
+        docx_future = pool.submit(md_to_docx, markdown, docx_path, doc_type)
+        pdf_future = pool.submit(md_to_pdf, markdown, pdf_path)
+        try:
+            pdf_future.result()
+        except BrokenProcessPool:
+            raise
+        except Exception:
+            pass
+        docx_future.result()
+    except BrokenProcessPool:
+        # A worker died — drop the pool and render in-process this time
+        _drop_render_pool(pool)
+        md_to_docx(markdown, docx_path, doc_type=doc_type)
+        try:
+            md_to_pdf(markdown, pdf_path)
+        except Exception:
+            pass
+
+
+def _renders_current(markdown: str, md_path: str, docx_path: str, pdf_path: str) -> bool:
+    """True if md_path already holds markdown and both documents were rendered after it."""
+    try:
+        with open(md_path) as f:
+            if f.read() != markdown:
+                return False
+        md_mtime = os.stat(md_path).st_mtime_ns
+        return all(os.stat(p).st_mtime_ns >= md_mtime for p in (docx_path, pdf_path))
+    except OSError:
+        return False
+
+
+def _save_and_render(markdown: str, base_path: str, doc_type: str = "resume"):
+    """Write base_path.md and render base_path.docx/.pdf from it.
+
+    Skipped entirely when the same markdown was already saved and rendered
+    (an identical completion on retry or regenerate), leaving the files as they are.
+    """
+    md_path = f"{base_path}.md"
+    docx_path = f"{base_path}.docx"
+    pdf_path = f"{base_path}.pdf"
+    if _renders_current(markdown, md_path, docx_path, pdf_path):
+        return
+
+    with open(md_path, "w") as f:
+        f.write(markdown)
+    _render_documents(markdown, docx_path, pdf_path, doc_type=doc_type)
+
+
+# Parsed resume rows for _pick_best_resume, reused until the database changes
+_resumes_cache = None
+_resumes_cache_key = None
+
+
+def _load_resumes() -> list[tuple[str, str, frozenset[str] | None]]:
+    """Load (original_name, content_text, tag_words) for every resume with text.
+
+    tag_words is None for resumes without best_for tags. Cached across calls
+    and reloaded when the database or its WAL file changes on disk.
+    """
+    global _resumes_cache, _resumes_cache_key
     db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "jobs.db")
+
+    # Under WAL, commits land in the -wal file; the main file only changes on checkpoint
+    key = []
+    for path in (db_path, db_path + "-wal"):
+        try:
+            st = os.stat(path)
+            key.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            key.append(None)
+    key = tuple(key)
+    if _resumes_cache is not None and key == _resumes_cache_key:
+        return _resumes_cache
+
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     rows = conn.execute(
@@ -251,46 +137,58 @@ def _pick_best_resume(job: dict) -> tuple[str, str]:
     ).fetchall()
     conn.close()
 
-    if not rows:
+    resumes = []
+    for row in rows:
+        tag_words = None
+        best_for = row["best_for"]
+        if best_for:
+            try:
+                tags = json.loads(best_for) if isinstance(best_for, str) else best_for
+            except (json.JSONDecodeError, TypeError):
+                tags = []
+            tag_words = frozenset(w for tag in tags for w in _TAG_WORD_RE.findall(tag.lower()))
+        resumes.append((row["original_name"], row["content_text"] or "", tag_words))
+
+    _resumes_cache = resumes
+    _resumes_cache_key = key
+    return resumes
+
+
+def _pick_best_resume(job: dict) -> tuple[str, str]:
+    """Pick the best-matching uploaded resume for a job.
+
+    Compares each resume's best_for tags against the job title/description.
+    Returns (content_text, original_name) of the best match.
+    Falls back to the longest resume if no tag matches.
+    """
+    resumes = _load_resumes()
+    if not resumes:
         return "", ""
 
     job_text = f"{job.get('title', '')} {job.get('description', '')}".lower()
+    job_words = set(_TAG_WORD_RE.findall(job_text))
 
     best_score = -1
-    best_row = None
-    longest_row = None
+    best = None
+    longest = None
     longest_len = 0
 
-    for row in rows:
-        text = row["content_text"] or ""
-
+    for name, text, tag_words in resumes:
         # Track longest as fallback
         if len(text) > longest_len:
             longest_len = len(text)
-            longest_row = row
+            longest = (text, name)
 
         # Score by best_for tag overlap
-        best_for = row["best_for"]
-        if best_for:
-            try:
-                tags = json.loads(best_for) if isinstance(best_for, str) else best_for
-            except (json.JSONDecodeError, TypeError):
-                tags = []
-
-            score = 0
-            for tag in tags:
-                # Check if any word from the tag appears in job text
-                tag_words = tag.lower().split()
-                for word in tag_words:
-                    if len(word) > 3 and word in job_text:
-                        score += 1
+        if tag_words is not None:
+            score = len(tag_words & job_words)
             if score > best_score:
                 best_score = score
-                best_row = row
+                best = (text, name)
 
-    chosen = best_row if best_score > 0 else longest_row
+    chosen = best if best_score > 0 else longest
     if chosen:
-        return chosen["content_text"], chosen["original_name"]
+        return chosen
     return "", ""
 
 
@@ -344,9 +242,81 @@ def _build_keyword_blocks(job: dict) -> tuple[str, str]:
     return keyword_block, gap_block
 
 
-def generate_resume(job: dict, settings: dict = None) -> dict:
+# Profile-derived prompt text for the last profile seen: (profile, sections)
+_profile_sections = None
+
+
+def _profile_prompt_sections(profile: dict) -> dict:
+    """Prompt sections that depend only on the candidate profile, not the job.
+
+    load_candidate_profile returns the same dict until the file changes, so
+    these are built once per profile rather than once per generated document.
+    """
+    global _profile_sections
+    cached = _profile_sections
+    if cached is not None and cached[0] is profile:
+        return cached[1]
+
+    work_history = profile.get("work_history", [])
+    skills = profile.get("all_skills", [])
+
+    # Resume: complete work history with every highlight
+    resume_lines = []
+    for wh in work_history:
+        start = wh.get("start_year", "")
+        end = wh.get("end_year", "")
+        date_range = f"{start}-{end}" if start else wh.get("duration", "")
+        location = wh.get("location", "")
+        loc_str = f" | {location}" if location else ""
+        resume_lines.append(f"\n### {wh['title']} @ {wh['company']}{loc_str} [{date_range}]\n")
+        for hl in wh.get("highlights", []):
+            resume_lines.append(f"  - {hl}\n")
+
+    # Cover letter: five most recent positions, two highlights each
+    cover_lines = []
+    for wh in work_history[:5]:
+        highlights = "; ".join(wh.get("highlights", [])[:2])
+        start = wh.get("start_year", "")
+        end = wh.get("end_year", "")
+        date_range = f"{start}-{end}" if start else wh.get("duration", "")
+        location = wh.get("location", "")
+        loc_str = f", {location}" if location else ""
+        cover_lines.append(f"- {wh['title']} @ {wh['company']}{loc_str} ({date_range}): {highlights}\n")
+
+    sections = {
+        "core_strengths": ", ".join(profile.get("core_strengths", [])),
+        "skills_resume": ", ".join(skills[:25]),
+        "skills_cover": ", ".join(skills[:20]),
+        "work_history_resume": "".join(resume_lines),
+        "work_history_cover": "".join(cover_lines),
+    }
+    _profile_sections = (profile, sections)
+    return sections
+
+
+def _save_document_path(job_id: int, column: str, base_path: str,
+                        conn: sqlite3.Connection = None):
+    """Record a generated document's base path on the job, reusing conn if given."""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db()
+    try:
+        with batch(conn):
+            conn.execute(
+                f"UPDATE jobs SET {column} = ?, updated_at = datetime('now') WHERE id = ?",
+                (base_path, job_id),
+            )
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def generate_resume(job: dict, settings: dict = None,
+                    conn: sqlite3.Connection = None) -> dict:
     """Generate a tailored resume for a specific job posting.
 
+    Batch callers can pass a shared conn for the job record update.
+
     Returns {ok, markdown, path, resume_source} or {error}.
     """
     if not settings:
@@ -372,17 +342,7 @@ def generate_resume(job: dict, settings: dict = None) -> dict:
     # Extract keyword and gap data from scoring (if available)
     keyword_block, gap_block = _build_keyword_blocks(job)
 
-    # Build complete work history with highlights for the prompt
-    work_history_block = ""
-    for wh in profile.get("work_history", []):
-        start = wh.get("start_year", "")
-        end = wh.get("end_year", "")
-        date_range = f"{start}-{end}" if start else wh.get("duration", "")
-        location = wh.get("location", "")
-        loc_str = f" | {location}" if location else ""
-        work_history_block += f"\n### {wh['title']} @ {wh['company']}{loc_str} [{date_range}]\n"
-        for hl in wh.get("highlights", []):
-            work_history_block += f"  - {hl}\n"
+    sections = _profile_prompt_sections(profile)
 
     prompt = f"""You are an expert resume writer. Create a tailored resume for this specific job posting.
 
@@ -390,12 +350,12 @@ CANDIDATE PROFILE:
 Name: {profile.get('name', 'Unknown')}
 Headline: {profile.get('headline', '')}
 Experience: {profile.get('experience_years', 0)}+ years
-Core Strengths: {', '.join(profile.get('core_strengths', []))}
-Key Skills: {', '.join(profile.get('all_skills', [])[:25])}
+Core Strengths: {sections['core_strengths']}
+Key Skills: {sections['skills_resume']}
 Unique Value: {profile.get('unique_value', '')}
 
 COMPLETE WORK HISTORY — EVERY position below MUST appear in the final resume:
-{work_history_block}
+{sections['work_history_resume']}
 
 ADDITIONAL DETAIL FROM SOURCE RESUME (supplement the work history above):
 {resume_text[:5000]}
@@ -425,37 +385,21 @@ ABSOLUTE RULES — VIOLATING THESE MAKES THE RESUME UNUSABLE:
 
 Output the resume in clean markdown. No commentary before or after — just the resume."""
 
+    # A first generation may reuse a stored completion (e.g. retrying after a
+    # render failure); Regenerate always asks the LLM for a fresh draft
     result = llm_chat(
         [{"role": "user", "content": prompt}],
         settings,
+        use_cache=not job.get("resume_path"),
     )
 
-    # Save markdown
+    # Save markdown, then convert to DOCX and PDF
     os.makedirs(GENERATED_DIR, exist_ok=True)
-    md_filename = f"{job['id']}_resume.md"
-    md_path = os.path.join(GENERATED_DIR, md_filename)
-    with open(md_path, "w") as f:
-        f.write(result)
-
-    # Convert to DOCX and PDF
-    docx_path = os.path.join(GENERATED_DIR, f"{job['id']}_resume.docx")
-    pdf_path = os.path.join(GENERATED_DIR, f"{job['id']}_resume.pdf")
-    _md_to_docx(result, docx_path, doc_type="resume")
-    try:
-        _md_to_pdf(result, pdf_path)
-    except Exception:
-        pass  # PDF is optional — Unicode font issues shouldn't block generation
+    base_path = os.path.join(GENERATED_DIR, f"{job['id']}_resume")
+    _save_and_render(result, base_path, doc_type="resume")
 
     # Update job record (store base path without extension)
-    base_path = os.path.join(GENERATED_DIR, f"{job['id']}_resume")
-    db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "jobs.db")
-    conn = sqlite3.connect(db_path)
-    conn.execute(
-        "UPDATE jobs SET resume_path = ?, updated_at = datetime('now') WHERE id = ?",
-        (base_path, job["id"]),
-    )
-    conn.commit()
-    conn.close()
+    _save_document_path(job["id"], "resume_path", base_path, conn)
 
     return {
         "ok": True,
@@ -465,9 +409,12 @@ Output the resume in clean markdown. No commentary before or after — just the
     }
 
 
-def generate_cover_letter(job: dict, settings: dict = None) -> dict:
+def generate_cover_letter(job: dict, settings: dict = None,
+                          conn: sqlite3.Connection = None) -> dict:
     """Generate a tailored cover letter for a specific job posting.
 
+    Batch callers can pass a shared conn for the job record update.
+
     Returns {ok, markdown, path} or {error}.
     """
     if not settings:
@@ -489,15 +436,7 @@ def generate_cover_letter(job: dict, settings: dict = None) -> dict:
     # Extract keyword and gap data from scoring (if available)
     keyword_block, gap_block = _build_keyword_blocks(job)
 
-    work_history = ""
-    for wh in profile.get("work_history", [])[:5]:
-        highlights = "; ".join(wh.get("highlights", [])[:2])
-        start = wh.get("start_year", "")
-        end = wh.get("end_year", "")
-        date_range = f"{start}-{end}" if start else wh.get("duration", "")
-        location = wh.get("location", "")
-        loc_str = f", {location}" if location else ""
-        work_history += f"- {wh['title']} @ {wh['company']}{loc_str} ({date_range}): {highlights}\n"
+    sections = _profile_prompt_sections(profile)
 
     prompt = f"""You are an expert career coach and cover letter writer. Write a professional, compelling cover letter for this specific job.
 
@@ -505,13 +444,13 @@ CANDIDATE:
 Name: {profile.get('name', 'Unknown')}
 Headline: {profile.get('headline', '')}
 Experience: {profile.get('experience_years', 0)}+ years
-Core Strengths: {', '.join(profile.get('core_strengths', []))}
-Key Skills: {', '.join(profile.get('all_skills', [])[:20])}
+Core Strengths: {sections['core_strengths']}
+Key Skills: {sections['skills_cover']}
 Unique Value: {profile.get('unique_value', '')}
 {f'Elevator Pitch: {elevator_pitch}' if elevator_pitch else ''}
 
 RELEVANT WORK HISTORY:
-{work_history}
+{sections['work_history_cover']}
 
 TARGET JOB:
 {job_info}
@@ -539,34 +478,16 @@ Output only the cover letter. No commentary before or after."""
     result = llm_chat(
         [{"role": "user", "content": prompt}],
         settings,
+        use_cache=not job.get("cover_letter_path"),
     )
 
-    # Save markdown
+    # Save markdown, then convert to DOCX and PDF
     os.makedirs(GENERATED_DIR, exist_ok=True)
-    md_filename = f"{job['id']}_cover.md"
-    md_path = os.path.join(GENERATED_DIR, md_filename)
-    with open(md_path, "w") as f:
-        f.write(result)
-
-    # Convert to DOCX and PDF
-    docx_path = os.path.join(GENERATED_DIR, f"{job['id']}_cover.docx")
-    pdf_path = os.path.join(GENERATED_DIR, f"{job['id']}_cover.pdf")
-    _md_to_docx(result, docx_path, doc_type="cover")
-    try:
-        _md_to_pdf(result, pdf_path)
-    except Exception:
-        pass  # PDF is optional — Unicode font issues shouldn't block generation
+    base_path = os.path.join(GENERATED_DIR, f"{job['id']}_cover")
+    _save_and_render(result, base_path, doc_type="cover")
 
     # Update job record (store base path without extension)
-    base_path = os.path.join(GENERATED_DIR, f"{job['id']}_cover")
-    db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "jobs.db")
-    conn = sqlite3.connect(db_path)
-    conn.execute(
-        "UPDATE jobs SET cover_letter_path = ?, updated_at = datetime('now') WHERE id = ?",
-        (base_path, job["id"]),
-    )
-    conn.commit()
-    conn.close()
+    _save_document_path(job["id"], "cover_letter_path", base_path, conn)
 
     return {
         "ok": True,
@@ -575,12 +496,38 @@ Output only the cover letter. No commentary before or after."""
     }
 
 
+def generate_batch(jobs: list[dict], settings: dict = None) -> list[dict]:
+    """Generate tailored resumes for many jobs, overlapping the LLM calls.
+
+    Up to settings["llm_concurrency"] jobs run at once. Returns one result per
+    job, in input order, each tagged with job_id; failures become {error}.
+    """
+    if not settings:
+        settings = load_settings()
+    if not jobs:
+        return []
+
+    def _one(job):
+        try:
+            result = generate_resume(job, settings)
+        except Exception as e:
+            result = {"error": str(e)}
+        result["job_id"] = job["id"]
+        return result
+
+    workers = max(1, min(int(settings.get("llm_concurrency", 4)), len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_one, jobs))
+
+
 def revise_document(job: dict, doc_type: str, instruction: str,
-                    settings: dict = None) -> dict:
+                    settings: dict = None, use_cache: bool = False) -> dict:
     """Revise a previously generated resume or cover letter based on user feedback.
 
     doc_type: "resume" or "cover"
     instruction: user's revision note (e.g. "emphasize leadership experience")
+    use_cache: off by default — resubmitting the same note means the user wants
+        another attempt, not the revision they already rejected.
     Returns {ok, markdown, path} or {error}.
     """
     if not settings:
@@ -635,20 +582,11 @@ INSTRUCTIONS:
     result = llm_chat(
         [{"role": "user", "content": prompt}],
         settings,
+        use_cache=use_cache,
     )
 
-    # Overwrite the markdown file
-    with open(md_path, "w") as f:
-        f.write(result)
-
-    # Regenerate DOCX and PDF from the revised markdown
-    docx_path = f"{base_path}.docx"
-    pdf_path = f"{base_path}.pdf"
-    _md_to_docx(result, docx_path, doc_type=doc_type)
-    try:
-        _md_to_pdf(result, pdf_path)
-    except Exception:
-        pass  # PDF is optional
+    # Overwrite the markdown file and regenerate DOCX and PDF from it
+    _save_and_render(result, base_path, doc_type=doc_type)
 
     return {
         "ok": True,
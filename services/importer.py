@@ -79,14 +79,30 @@ CORRECTIONS = {
     },
 }
 
+# Flattened (field, normalized value) -> correction, built once at import.
+# Keys are stripped like the cell values they're matched against.
+_CORRECTIONS_FLAT = {
+    (field, typo.strip().lower()): fixed
+    for field, fixes in CORRECTIONS.items()
+    for typo, fixed in fixes.items()
+}
+
+# Spreadsheet status (after corrections) -> our schema
+STATUS_MAP = {
+    "Applied": "applied",
+    "Rejected": "rejected",
+    "Interviewing": "interviewing",
+    "Offer": "offer",
+    "New": "new",
+}
+
 
 def clean_value(field: str, raw: str) -> str:
     """Apply field-specific corrections to a raw value."""
     if not raw:
         return raw
-    lookup = raw.strip().lower()
-    corrections = CORRECTIONS.get(field, {})
-    return corrections.get(lookup, raw.strip())
+    stripped = raw.strip()
+    return _CORRECTIONS_FLAT.get((field, stripped.lower()), stripped)
 
 
 def import_spreadsheet(filepath: str) -> list[dict]:
@@ -94,13 +110,13 @@ def import_spreadsheet(filepath: str) -> list[dict]:
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"Spreadsheet not found: {filepath}")
 
-    wb = load_workbook(filepath)
+    # Read-only mode streams the sheet XML instead of building styled Cell objects
+    wb = load_workbook(filepath, read_only=True, data_only=True)
     ws = wb.active
     jobs = []
 
-    for row in ws.iter_rows(min_row=2, values_only=False):
-        cells = [cell.value for cell in row]
-
+    # max_col pads short rows, so columns A-H are always present
+    for cells in ws.iter_rows(min_row=2, max_col=8, values_only=True):
         # Skip empty rows and header rows
         if not any(cells):
             continue
@@ -150,14 +166,7 @@ def import_spreadsheet(filepath: str) -> list[dict]:
         status_clean = clean_value("status", str(status)) if status else "Applied"
 
         # Map statuses to our schema
-        status_map = {
-            "Applied": "applied",
-            "Rejected": "rejected",
-            "Interviewing": "interviewing",
-            "Offer": "offer",
-            "New": "new",
-        }
-        final_status = status_map.get(status_clean, "applied")
+        final_status = STATUS_MAP.get(status_clean, "applied")
 
         jobs.append({
             "source": "import",
@@ -172,22 +181,25 @@ def import_spreadsheet(filepath: str) -> list[dict]:
             "notes": f"Imported from spreadsheet. Original source: {source_clean}",
         })
 
+    wb.close()
     return jobs
 
 
 def insert_imported_jobs(conn, jobs: list[dict]) -> dict:
     """Insert imported jobs into database. Returns summary."""
-    from services.db import upsert_job
+    from services.db import batch, upsert_job
 
     inserted = 0
     skipped = 0
-    for job in jobs:
-        # Use a synthetic URL for dedup on reimport
-        job["url"] = f"import://{job.get('company', 'unknown')}/{job.get('title', 'unknown')}/{job.get('applied_date', 'unknown')}"
-        result = upsert_job(conn, job)
-        if result > 0:
-            inserted += 1
-        else:
-            skipped += 1
+    # One transaction for the whole sheet; upsert_job's commits join the batch
+    with batch(conn):
+        for job in jobs:
+            # Use a synthetic URL for dedup on reimport
+            job["url"] = f"import://{job.get('company', 'unknown')}/{job.get('title', 'unknown')}/{job.get('applied_date', 'unknown')}"
+            result = upsert_job(conn, job)
+            if result > 0:
+                inserted += 1
+            else:
+                skipped += 1
 
     return {"inserted": inserted, "skipped": skipped, "total": len(jobs)}
@@ -2,73 +2,267 @@
 LLM abstraction — dispatches to OpenRouter, Google Gemini, or Ollama based on settings.
 """
 
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
 import httpx
-from openai import OpenAI
+from openai import APIConnectionError, OpenAI
 import google.generativeai as genai
 
+from services import llm_cache
+
+logger = logging.getLogger("jobhunter3000.llm")
+
+
+# Shared keep-alive clients: repeat calls reuse pooled connections instead of
+# paying a TCP (and TLS) handshake per request. Both are safe across threads.
+_ollama_client = httpx.Client(timeout=120.0)
+_openrouter_clients = {}
+
+# Identical requests currently being dispatched, by cache key
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+# Transient provider failures (rate limits, overload, dropped connections) are
+# retried with jittered exponential backoff; anything else fails fast
+RETRY_ATTEMPTS = 4
+RETRY_MAX_WAIT = 30.0
+
+# Earliest time the next provider call may start, when settings["llm_qpm"] is set
+_next_call_at = 0.0
+_throttle_lock = threading.Lock()
+
 
 def _get_openrouter_client(settings: dict) -> OpenAI:
-    return OpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=settings.get("openrouter_api_key", ""),
-    )
+    api_key = settings.get("openrouter_api_key", "")
+    client = _openrouter_clients.get(api_key)
+    if client is None:
+        # Retries are handled by _dispatch_with_retry, the same way for every provider
+        client = OpenAI(base_url="https://openrouter.ai/api/v1", api_key=api_key, max_retries=0)
+        _openrouter_clients[api_key] = client
+    return client
 
 
-def llm_chat(messages: list[dict], settings: dict) -> str:
+def llm_chat(messages: list[dict], settings: dict, use_cache: bool = True,
+             max_age_days: float = None, json_mode: bool = False,
+             validate: Callable[[str], object] = None) -> str:
     """Send messages to LLM, return completion text.
 
     messages: list of {"role": "system"|"user"|"assistant", "content": "..."}
     settings: from load_settings()
+    use_cache: return a stored completion for an identical request if there is one.
+        Pass False when the caller wants a fresh answer (regenerate, connection
+        test, chat); the fresh completion still replaces the stored one.
+    max_age_days: only reuse a stored completion younger than this (None = any age).
+    json_mode: ask the provider to reply with a bare JSON object (OpenRouter
+        response_format, Gemini response_mime_type, Ollama format). The prompt
+        should still ask for JSON; callers keep parsing defensively. Part of the
+        cache key, so JSON and free-text replies are never served to each other.
+    validate: called with the completion (e.g. parse_llm_json); a reply it raises
+        on is returned but never stored, and a stored reply it raises on counts
+        as a miss, so a malformed answer is not replayed on the next call.
+
+    Every provider is called at temperature 0, so a stored completion is the
+    answer the same request would most likely get again.
     """
+    key = llm_cache.cache_key(messages, settings, json_mode)
+    cache_enabled = settings.get("llm_cache_enabled", True)
+    capacity = settings.get("llm_lru_capacity", llm_cache.DEFAULT_LRU_CAPACITY)
+    if cache_enabled and use_cache:
+        cached = llm_cache.lookup(key, capacity, max_age_days)
+        if cached is not None and _is_valid(cached, validate):
+            logger.debug(f"llm cache=hit key={key[:8]}")
+            return cached
+
+    start = time.perf_counter()
+    result, owner = _dispatch_once(key, messages, settings, json_mode)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if owner:
+        llm_cache.count("calls")
+        llm_cache.count("call_ms", elapsed_ms)
+    else:
+        llm_cache.count("coalesced")
+    logger.debug(
+        f"llm cache={'miss' if owner else 'coalesced'} key={key[:8]} latency_ms={elapsed_ms:.1f}"
+    )
+    if cache_enabled and owner and _is_valid(result, validate):
+        llm_cache.store(key, result, capacity)
+    return result
+
+
+def _is_valid(result: str, validate) -> bool:
+    """True if there is no validator or it accepts result without raising."""
+    if validate is None:
+        return True
+    try:
+        validate(result)
+    except Exception:
+        logger.debug("llm reply failed validation; not cached")
+        return False
+    return True
+
+
+def parse_llm_json(result: str) -> dict:
+    """Parse the JSON object in an LLM reply, ignoring markdown fences or chatter around it.
+
+    Slices from the first "{" to the last "}" in one pass, so ```json fences and
+    leading/trailing commentary need no separate stripping.
+    """
+    start = result.find("{")
+    end = result.rfind("}")
+    if start == -1 or end < start:
+        return json.loads(result)
+    return json.loads(result[start:end + 1])
+
+
+def _dispatch_once(key: str, messages: list[dict], settings: dict,
+                   json_mode: bool = False) -> tuple[str, bool]:
+    """Dispatch, sharing the call with any identical request already in flight.
+
+    Returns (result, owner); owner is False when the result came from another
+    caller's request (e.g. a double-clicked Generate).
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[key] = future
+    if not owner:
+        return future.result(), False
+
+    try:
+        result = _dispatch_with_retry(messages, settings, json_mode)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result, True
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+
+
+def _is_transient(e: Exception) -> bool:
+    """True for rate-limit, 5xx, timeout and connection errors from any provider."""
+    if isinstance(e, (httpx.TransportError, APIConnectionError)):
+        return True
+    status = getattr(e, "status_code", None)  # OpenAI SDK
+    if status is None and isinstance(e, httpx.HTTPStatusError):
+        status = e.response.status_code
+    if status is None:
+        status = getattr(e, "code", None)  # google.api_core
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def _throttle(qpm: float):
+    """Space provider calls at least 60/qpm seconds apart across all threads."""
+    global _next_call_at
+    if not qpm:
+        return
+    with _throttle_lock:
+        now = time.monotonic()
+        wait = _next_call_at - now
+        _next_call_at = max(now, _next_call_at) + 60.0 / qpm
+    if wait > 0:
+        time.sleep(wait)
+
+
+def _dispatch_with_retry(messages: list[dict], settings: dict, json_mode: bool = False) -> str:
+    """_dispatch, throttled to settings["llm_qpm"] and retried on transient errors."""
+    qpm = settings.get("llm_qpm", 0)
+    for attempt in range(RETRY_ATTEMPTS):
+        _throttle(qpm)
+        try:
+            return _dispatch(messages, settings, json_mode)
+        except Exception as e:
+            if attempt == RETRY_ATTEMPTS - 1 or not _is_transient(e):
+                raise
+            wait = min(RETRY_MAX_WAIT, 2 ** attempt) * random.uniform(0.5, 1.0)
+            logger.warning(f"LLM call failed ({e}); retry {attempt + 1} in {wait:.1f}s")
+            time.sleep(wait)
+
+
+def _dispatch(messages: list[dict], settings: dict, json_mode: bool = False) -> str:
+    """Call the configured provider and return the completion text."""
     provider = settings.get("llm_provider", "ollama")
 
     if provider == "openrouter":
         client = _get_openrouter_client(settings)
+        extra = {"response_format": {"type": "json_object"}} if json_mode else {}
         response = client.chat.completions.create(
             model=settings.get("openrouter_model", "anthropic/claude-sonnet-4"),
             messages=messages,
             temperature=0,
+            **extra,
         )
         return response.choices[0].message.content
 
     elif provider == "google":
         genai.configure(api_key=settings.get("google_api_key", ""))
-        model = genai.GenerativeModel(settings.get("google_model", "gemini-2.0-flash"))
+        generation_config = {"temperature": 0}
+        if json_mode:
+            generation_config["response_mime_type"] = "application/json"
+        model = genai.GenerativeModel(
+            settings.get("google_model", "gemini-2.0-flash"),
+            generation_config=generation_config,
+        )
 
         # Convert OpenAI-style messages to Gemini format
         # Gemini wants: [{"role": "user"|"model", "parts": ["text"]}]
         # System messages get prepended to the first user message
-        system_text = ""
+        system_parts = []
         gemini_history = []
         for msg in messages:
             role = msg["role"]
             content = msg["content"]
             if role == "system":
-                system_text += content + "\n\n"
+                system_parts.append(content + "\n\n")
             elif role == "assistant":
                 gemini_history.append({"role": "model", "parts": [content]})
             else:  # user
-                text = (system_text + content) if system_text else content
-                system_text = ""
-                gemini_history.append({"role": "user", "parts": [text]})
+                if system_parts:
+                    system_parts.append(content)
+                    content = "".join(system_parts)
+                    system_parts = []
+                gemini_history.append({"role": "user", "parts": [content]})
 
         # Start chat with history (all but last message), send last message
-        if len(gemini_history) > 1:
-            chat = model.start_chat(history=gemini_history[:-1])
-            response = chat.send_message(gemini_history[-1]["parts"][0])
-        else:
-            chat = model.start_chat()
-            response = chat.send_message(gemini_history[0]["parts"][0])
+        chat = model.start_chat(history=gemini_history[:-1])
+        response = chat.send_message(gemini_history[-1]["parts"][0])
 
         return response.text
 
     else:  # ollama
-        endpoint = settings.get("ollama_endpoint", "http://localhost:11434")
-        model = settings.get("ollama_model", "qwen2.5-coder:32b")
-        resp = httpx.post(
-            f"{endpoint}/api/chat",
-            json={"model": model, "messages": messages, "stream": False},
-            timeout=120.0,
-        )
+        return "".join(_ollama_stream(messages, settings, json_mode))
+
+
+def _ollama_stream(messages: list[dict], settings: dict, json_mode: bool = False):
+    """Yield Ollama completion chunks as the server produces them.
+
+    Ollama streams newline-delimited JSON objects; the last one has done=true.
+    """
+    endpoint = settings.get("ollama_endpoint", "http://localhost:11434")
+    model = settings.get("ollama_model", "qwen2.5-coder:32b")
+    payload = {"model": model, "messages": messages, "stream": True, "options": {"temperature": 0}}
+    if json_mode:
+        payload["format"] = "json"
+    with _ollama_client.stream("POST", f"{endpoint}/api/chat", json=payload) as resp:
         resp.raise_for_status()
-        return resp.json()["message"]["content"]
+        for line in resp.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                raise RuntimeError(f"Ollama error: {chunk['error']}")
+            content = chunk.get("message", {}).get("content")
+            if content:
+                yield content
+            if chunk.get("done"):
+                break
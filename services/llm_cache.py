@@ -0,0 +1,146 @@
+"""
+LLM response cache — exact-match completions stored in SQLite, keyed by prompt hash.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from services.db import get_db
+
+DEFAULT_LRU_CAPACITY = 512
+
+# Stored completions older than this are deleted, at startup and every PRUNE_EVERY stores
+RETENTION_DAYS = 30
+PRUNE_EVERY = 500
+
+# In-process LRU in front of the SQLite table: repeat hits skip the DB round-trip.
+# Values are (response, stored_at epoch seconds) so max_age checks work here too.
+_lru = OrderedDict()
+_lru_lock = threading.Lock()
+
+# Counters since process start, reported by stats()
+_stats = {"lru_hits": 0, "db_hits": 0, "misses": 0, "coalesced": 0, "calls": 0, "call_ms": 0.0}
+_stats_lock = threading.Lock()
+_stores_since_prune = 0
+
+
+def count(name: str, amount=1):
+    """Add amount to one of the _stats counters."""
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def stats() -> dict:
+    """Snapshot of cache counters plus derived hit rate and estimated time saved."""
+    with _stats_lock:
+        snap = dict(_stats)
+    hits = snap["lru_hits"] + snap["db_hits"]
+    lookups = hits + snap["misses"]
+    avg_call_ms = snap["call_ms"] / snap["calls"] if snap["calls"] else 0.0
+    snap["call_ms"] = round(snap["call_ms"], 1)
+    snap["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+    snap["avg_call_ms"] = round(avg_call_ms, 1)
+    # Every hit or coalesced wait is one provider call that didn't happen
+    snap["est_ms_saved"] = round((hits + snap["coalesced"]) * avg_call_ms, 1)
+    snap["lru_size"] = len(_lru)
+    return snap
+
+
+def _remember(key: str, response: str, capacity: int, stored_at: float = None):
+    """Insert or refresh key in the LRU, evicting the oldest entries past capacity."""
+    with _lru_lock:
+        _lru[key] = (response, stored_at if stored_at is not None else time.time())
+        _lru.move_to_end(key)
+        while len(_lru) > capacity:
+            _lru.popitem(last=False)
+
+
+def cache_key(messages: list[dict], settings: dict, json_mode: bool = False) -> str:
+    """SHA-256 of the provider, model, output mode and full message list."""
+    provider = settings.get("llm_provider", "ollama")
+    key_src = json.dumps(
+        {"p": provider, "m": settings.get(f"{provider}_model", ""), "j": bool(json_mode),
+         "msgs": messages},
+        sort_keys=True,
+    )
+    return hashlib.sha256(key_src.encode()).hexdigest()
+
+
+def lookup(key: str, capacity: int = DEFAULT_LRU_CAPACITY, max_age_days: float = None) -> str | None:
+    """Return the stored completion for key, or None on a miss.
+
+    max_age_days: treat completions older than this as a miss (None = no limit).
+    """
+    min_stored_at = time.time() - max_age_days * 86400 if max_age_days else 0
+    with _lru_lock:
+        entry = _lru.get(key)
+        if entry is not None and entry[1] >= min_stored_at:
+            _lru.move_to_end(key)
+            response = entry[0]
+        else:
+            response = None
+    if response is not None:
+        count("lru_hits")
+        return response
+
+    conn = get_db()
+    try:
+        row = conn.execute(
+            "SELECT response, CAST(strftime('%s', created_at) AS INTEGER) AS stored_at "
+            "FROM llm_cache WHERE prompt_hash = ? AND created_at >= datetime(?, 'unixepoch')",
+            (key, int(min_stored_at)),
+        ).fetchone()
+    except sqlite3.Error:
+        # The cache is an optimization — a missing table (tables not yet migrated) is a miss
+        row = None
+    finally:
+        conn.close()
+    if not row:
+        count("misses")
+        return None
+    count("db_hits")
+    _remember(key, row["response"], capacity, row["stored_at"])
+    return row["response"]
+
+
+def prune(conn: sqlite3.Connection, retention_days: int = RETENTION_DAYS) -> int:
+    """Delete stored completions older than retention_days. Returns rows removed."""
+    try:
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < datetime('now', ?)",
+                (f"-{int(retention_days)} days",),
+            )
+    except sqlite3.Error:
+        return 0
+    return cursor.rowcount
+
+
+def store(key: str, response: str, capacity: int = DEFAULT_LRU_CAPACITY):
+    """Record (or replace) the completion for key, pruning old rows now and then."""
+    global _stores_since_prune
+    _remember(key, response, capacity)
+    with _stats_lock:
+        _stores_since_prune += 1
+        due = _stores_since_prune >= PRUNE_EVERY
+        if due:
+            _stores_since_prune = 0
+    conn = get_db()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (prompt_hash, response, created_at) "
+                "VALUES (?, ?, datetime('now'))",
+                (key, response),
+            )
+    except sqlite3.Error:
+        pass
+    else:
+        if due:
+            prune(conn)
+    finally:
+        conn.close()
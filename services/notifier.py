@@ -5,6 +5,9 @@ Pushover notification service — sends job match alerts to phone.
 import json
 import requests
 
+# Reused across alerts so Pushover calls share a keep-alive TLS connection
+_session = requests.Session()
+
 
 def send_notification(title: str, message: str, settings: dict,
                       url: str = None, priority: int = 0) -> dict:
@@ -28,7 +31,7 @@ def send_notification(title: str, message: str, settings: dict,
         data["url_title"] = "View Job Posting"
 
     try:
-        resp = requests.post("https://api.pushover.net/1/messages.json", data=data, timeout=10)
+        resp = _session.post("https://api.pushover.net/1/messages.json", data=data, timeout=10)
         if resp.status_code == 200:
             return {"ok": True}
         else:
@@ -0,0 +1,345 @@
+"""
+Markdown → DOCX/PDF rendering. Runs in the generator's spawned render workers,
+so it imports only the document libraries.
+"""
+
+import io
+import re
+from docx import Document
+from docx.shared import Pt, Inches, RGBColor
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn
+from fpdf import FPDF
+
+# Markdown patterns, compiled once instead of looked up per line
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_ITALIC_RE = re.compile(r"\*(.+?)\*")
+
+
+# Styled empty document, serialized once per process and reopened for each render
+_docx_template = None
+
+
+def _new_styled_document():
+    """Open a fresh Document with the resume fonts, spacing and margins applied."""
+    global _docx_template
+    if _docx_template is None:
+        _docx_template = _build_docx_template()
+    return Document(io.BytesIO(_docx_template))
+
+
+def _build_docx_template() -> bytes:
+    """Build the styled empty document and return it as .docx bytes."""
+    doc = Document()
+
+    # Set default font
+    style = doc.styles["Normal"]
+    font = style.font
+    font.name = "Calibri"
+    font.size = Pt(11)
+    font.color.rgb = RGBColor(0x33, 0x33, 0x33)
+
+    # Tighter paragraph spacing
+    style.paragraph_format.space_after = Pt(4)
+    style.paragraph_format.space_before = Pt(0)
+
+    # Set narrow margins
+    for section in doc.sections:
+        section.top_margin = Inches(0.6)
+        section.bottom_margin = Inches(0.6)
+        section.left_margin = Inches(0.75)
+        section.right_margin = Inches(0.75)
+
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def md_to_docx(markdown: str, output_path: str, doc_type: str = "resume"):
+    """Convert markdown text to a clean .docx file."""
+    doc = _new_styled_document()
+    # Resolve the bullet style once — python-docx scans every style definition
+    # on each by-name lookup, which dominated render time for bullet-heavy resumes
+    bullet_style_id = doc.styles["List Bullet"].style_id
+
+    for stripped in map(str.strip, markdown.splitlines()):
+        # Skip empty lines
+        if not stripped:
+            continue
+
+        # Horizontal rule → thin line (skip it, just adds spacing)
+        if stripped in ("---", "***", "___"):
+            continue
+
+        # H1: # Header
+        if stripped.startswith("# ") and not stripped.startswith("## "):
+            text = stripped[2:].strip()
+            text = _strip_bold(text)
+            p = doc.add_paragraph()
+            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            run = p.add_run(text)
+            run.bold = True
+            run.font.size = Pt(16)
+            run.font.color.rgb = RGBColor(0x1a, 0x1a, 0x1a)
+            p.paragraph_format.space_after = Pt(2)
+            continue
+
+        # H2: ## Section Header
+        if stripped.startswith("## "):
+            text = stripped[3:].strip()
+            text = _strip_bold(text)
+            p = doc.add_paragraph()
+            run = p.add_run(text.upper())
+            run.bold = True
+            run.font.size = Pt(12)
+            run.font.color.rgb = RGBColor(0x1a, 0x56, 0x8a)
+            p.paragraph_format.space_before = Pt(10)
+            p.paragraph_format.space_after = Pt(3)
+            # Add a bottom border
+            pPr = p._p.get_or_add_pPr()
+            pBdr = pPr.makeelement(qn("w:pBdr"), {})
+            bottom = pBdr.makeelement(qn("w:bottom"), {
+                qn("w:val"): "single",
+                qn("w:sz"): "4",
+                qn("w:space"): "1",
+                qn("w:color"): "1a568a",
+            })
+            pBdr.append(bottom)
+            pPr.append(pBdr)
+            continue
+
+        # H3: ### Sub-header
+        if stripped.startswith("### "):
+            text = stripped[4:].strip()
+            text = _strip_bold(text)
+            p = doc.add_paragraph()
+            run = p.add_run(text)
+            run.bold = True
+            run.font.size = Pt(11)
+            p.paragraph_format.space_before = Pt(6)
+            p.paragraph_format.space_after = Pt(2)
+            continue
+
+        # Bullet point: - text or * text
+        if _is_bullet(stripped):
+            text = stripped[2:].strip()
+            p = doc.add_paragraph()
+            p._p.style = bullet_style_id
+            _add_formatted_text(p, text)
+            p.paragraph_format.space_after = Pt(1)
+            p.paragraph_format.left_indent = Inches(0.25)
+            continue
+
+        # Regular paragraph (handle bold/italic inline)
+        p = doc.add_paragraph()
+        _add_formatted_text(p, stripped)
+        # Center lines that look like contact info (short, contain | or email)
+        if len(stripped) < 120 and ("|" in stripped or "@" in stripped):
+            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            p.paragraph_format.space_after = Pt(1)
+
+    doc.save(output_path)
+
+
+def _is_bullet(line: str) -> bool:
+    """True for '- item' / '* item' lines (marker followed by whitespace)."""
+    return len(line) > 1 and line[0] in "-*" and line[1].isspace()
+
+
+def _strip_bold(text: str) -> str:
+    """Remove **bold** markers; lines without any skip the regex entirely."""
+    if "**" not in text:
+        return text
+    return _BOLD_RE.sub(r"\1", text)
+
+
+def _strip_markers(text: str) -> str:
+    """Remove **bold** and *italic* markers for plain-text output."""
+    if "*" not in text:
+        return text
+    return _ITALIC_RE.sub(r"\1", _BOLD_RE.sub(r"\1", text))
+
+
+def _find_span(text: str, marker: str, start: int) -> tuple[int, int]:
+    """Find the next marker-wrapped span of non-* characters at or after start.
+
+    Returns (open, close) offsets of the markers, or (-1, -1) if there is none.
+    """
+    width = len(marker)
+    i = text.find(marker, start)
+    while i != -1:
+        close = text.find("*", i + width)
+        if close > i + width and text.startswith(marker, close):
+            return i, close
+        i = text.find(marker, i + 1)
+    return -1, -1
+
+
+def _inline_segments(text: str) -> list[tuple[str, bool, bool]]:
+    """Split a line into (text, bold, italic) runs in a single left-to-right scan."""
+    if "*" not in text:
+        return [(text, False, False)] if text else []
+
+    segments = []
+
+    def add(chunk: str, marker: str, bold: bool, italic: bool):
+        # A leftover piece wrapped in the marker still renders styled, as with re.split
+        if chunk.startswith(marker) and chunk.endswith(marker):
+            segments.append((chunk[len(marker):-len(marker)], bold, italic))
+        elif chunk:
+            segments.append((chunk, False, False))
+
+    def add_plain(chunk: str):
+        if chunk.startswith("**") and chunk.endswith("**"):
+            add(chunk, "**", True, False)
+            return
+        if "*" not in chunk:
+            if chunk:
+                segments.append((chunk, False, False))
+            return
+        # Italic spans only occur outside bold ones
+        pos = 0
+        while True:
+            i, close = _find_span(chunk, "*", pos)
+            if i == -1:
+                break
+            add(chunk[pos:i], "*", False, True)
+            segments.append((chunk[i + 1:close], False, True))
+            pos = close + 1
+        add(chunk[pos:], "*", False, True)
+
+    pos = 0
+    while True:
+        i, close = _find_span(text, "**", pos)
+        if i == -1:
+            break
+        add_plain(text[pos:i])
+        segments.append((text[i + 2:close], True, False))
+        pos = close + 2
+    add_plain(text[pos:])
+    return segments
+
+
+_W_R = qn("w:r")
+_W_RPR = qn("w:rPr")
+_W_B = qn("w:b")
+_W_I = qn("w:i")
+_W_T = qn("w:t")
+_XML_SPACE = qn("xml:space")
+
+
+def _add_formatted_text(paragraph, text):
+    """Add text to a paragraph, handling **bold** and *italic* markers.
+
+    Runs are built as raw <w:r> elements — the same XML add_run and the
+    bold/italic setters produce, without their per-child schema lookups.
+    """
+    p = paragraph._p
+    runs = []
+    for chunk, bold, italic in _inline_segments(text):
+        if "\t" in chunk:
+            # add_run turns tabs into <w:tab/>; keep that path for the rare case
+            p.extend(runs)
+            runs = []
+            run = paragraph.add_run(chunk)
+            if bold:
+                run.bold = True
+            if italic:
+                run.italic = True
+            continue
+
+        r = p.makeelement(_W_R, {})
+        if bold or italic:
+            rPr = r.makeelement(_W_RPR, {})
+            if bold:
+                rPr.append(rPr.makeelement(_W_B, {}))
+            if italic:
+                rPr.append(rPr.makeelement(_W_I, {}))
+            r.append(rPr)
+        if chunk:
+            t = r.makeelement(_W_T, {})
+            t.text = chunk
+            if len(chunk.strip()) < len(chunk):
+                t.set(_XML_SPACE, "preserve")
+            r.append(t)
+        runs.append(r)
+    p.extend(runs)
+
+
+def md_to_pdf(markdown: str, output_path: str):
+    """Convert markdown text to a clean PDF file."""
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=20)
+    pdf.add_page()
+    pdf.set_margins(20, 15, 20)
+
+    for stripped in map(str.strip, markdown.splitlines()):
+        # Skip empty lines — add small spacing
+        if not stripped:
+            pdf.ln(3)
+            continue
+
+        # Horizontal rule
+        if stripped in ("---", "***", "___"):
+            y = pdf.get_y()
+            pdf.set_draw_color(180, 180, 180)
+            pdf.line(20, y, 190, y)
+            pdf.ln(3)
+            continue
+
+        # H1
+        if stripped.startswith("# ") and not stripped.startswith("## "):
+            text = _strip_bold(stripped[2:].strip())
+            pdf.set_font("Helvetica", "B", 16)
+            pdf.set_text_color(26, 26, 26)
+            pdf.cell(0, 8, text, align="C", new_x="LMARGIN", new_y="NEXT")
+            pdf.ln(1)
+            continue
+
+        # H2
+        if stripped.startswith("## "):
+            text = _strip_bold(stripped[3:].strip())
+            pdf.ln(3)
+            pdf.set_font("Helvetica", "B", 12)
+            pdf.set_text_color(26, 86, 138)
+            pdf.cell(0, 7, text.upper(), new_x="LMARGIN", new_y="NEXT")
+            # Underline
+            y = pdf.get_y()
+            pdf.set_draw_color(26, 86, 138)
+            pdf.line(20, y, 190, y)
+            pdf.ln(2)
+            continue
+
+        # H3
+        if stripped.startswith("### "):
+            text = _strip_bold(stripped[4:].strip())
+            pdf.ln(2)
+            pdf.set_font("Helvetica", "B", 11)
+            pdf.set_text_color(51, 51, 51)
+            pdf.cell(0, 6, text, new_x="LMARGIN", new_y="NEXT")
+            pdf.ln(1)
+            continue
+
+        # Strip bold/italic markers for PDF (fpdf2 doesn't do inline mixed easily)
+        clean = _strip_markers(stripped)
+
+        # Bullet point
+        if _is_bullet(stripped):
+            text = clean[2:].strip()
+            pdf.set_font("Helvetica", "", 10)
+            pdf.set_text_color(51, 51, 51)
+            x = pdf.get_x()
+            pdf.cell(8, 5, chr(8226), new_x="END")  # bullet char
+            pdf.multi_cell(0, 5, text, new_x="LMARGIN", new_y="NEXT")
+            continue
+
+        # Regular paragraph
+        pdf.set_font("Helvetica", "", 10)
+        pdf.set_text_color(51, 51, 51)
+        # Center contact-like lines
+        if len(clean) < 120 and ("|" in clean or "@" in clean):
+            pdf.cell(0, 5, clean, align="C", new_x="LMARGIN", new_y="NEXT")
+        else:
+            pdf.multi_cell(0, 5, clean, new_x="LMARGIN", new_y="NEXT")
+
+    pdf.output(output_path)
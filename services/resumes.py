@@ -2,49 +2,90 @@
 Resume upload, storage, text extraction, and AI analysis.
 """
 
+import contextlib
+import hashlib
 import json
 import os
 import uuid
 from datetime import datetime
 
+from services.db import batch
+
 RESUME_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "resumes")
+PROFILE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "candidate_profile.json")
+
+# Accepted upload extensions -> stored file_type
+RESUME_TYPES = {".pdf": "pdf", ".docx": "docx", ".md": "markdown", ".txt": "text"}
+MAX_RESUME_BYTES = 20 * 1024 * 1024
+
+# Columns the resume list views use — leaves out the extracted text, the bulk of each row
+RESUME_LIST_COLUMNS = "id, filename, original_name, file_type, analysis, best_for, uploaded_at"
 
 
 def save_resume(file_bytes: bytes, original_name: str) -> dict:
-    """Save an uploaded resume file. Returns metadata dict."""
+    """Save an uploaded resume file. Returns metadata dict.
+
+    Raises ValueError for unsupported extensions or files over
+    MAX_RESUME_BYTES, before anything is written.
+    """
+    ext = os.path.splitext(original_name)[1].lower()
+    file_type = RESUME_TYPES.get(ext)
+    if file_type is None:
+        raise ValueError(f"Unsupported file type: {ext or 'none'}. Use PDF, DOCX, MD, or TXT.")
+    if len(file_bytes) > MAX_RESUME_BYTES:
+        raise ValueError(f"File too large: limit is {MAX_RESUME_BYTES // (1024 * 1024)} MB.")
+
     os.makedirs(RESUME_DIR, exist_ok=True)
 
     # Generate unique filename
-    ext = os.path.splitext(original_name)[1].lower()
     filename = f"{uuid.uuid4().hex[:12]}{ext}"
     file_path = os.path.join(RESUME_DIR, filename)
 
     with open(file_path, "wb") as f:
         f.write(file_bytes)
 
-    # Determine file type
-    type_map = {".pdf": "pdf", ".docx": "docx", ".md": "markdown", ".txt": "text"}
-    file_type = type_map.get(ext, "unknown")
-
     return {
         "filename": filename,
         "original_name": original_name,
         "file_path": file_path,
         "file_type": file_type,
         "size": len(file_bytes),
+        "sha256": hashlib.sha256(file_bytes).hexdigest(),
     }
 
 
+def _extract_pdf_text(file_path: str) -> str:
+    """Extract text from every page of a PDF.
+
+    Uses PDFium (native, much faster on text-heavy files) when pypdfium2 is
+    installed, otherwise the pure-Python PyPDF2 reader.
+    """
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        from PyPDF2 import PdfReader
+        reader = PdfReader(file_path)
+        return "".join(page.extract_text() or "" for page in reader.pages)
+
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        pages = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+    # PDFium reports line breaks as CRLF
+    return "\n".join(pages).replace("\r\n", "\n")
+
+
 def extract_text(file_path: str, file_type: str) -> str:
     """Extract text content from a resume file."""
     if file_type == "pdf":
         try:
-            from PyPDF2 import PdfReader
-            reader = PdfReader(file_path)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() or ""
-            return text.strip()
+            return _extract_pdf_text(file_path).strip()
         except Exception as e:
             return f"[PDF extraction failed: {e}]"
 
@@ -57,15 +98,20 @@ def extract_text(file_path: str, file_type: str) -> str:
             return f"[DOCX extraction failed: {e}]"
 
     elif file_type in ("markdown", "text"):
-        with open(file_path, "r", errors="replace") as f:
+        # read() with no size pulls the whole file in one call; decode as UTF-8
+        # explicitly rather than with the platform's locale encoding
+        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
             return f.read().strip()
 
     return "[Unsupported file type]"
 
 
-def analyze_resume(content_text: str, settings: dict) -> dict:
-    """Use LLM to analyze a resume's strengths and target roles."""
-    from services.llm import llm_chat
+def analyze_resume(content_text: str, settings: dict, use_cache: bool = True) -> dict:
+    """Use LLM to analyze a resume's strengths and target roles.
+
+    use_cache=False asks the LLM again instead of reusing a stored analysis (re-analyze).
+    """
+    from services.llm import llm_chat, parse_llm_json
 
     prompt = """Analyze this resume and return ONLY valid JSON (no markdown fences, no explanation).
 
@@ -85,17 +131,13 @@ RESUME:
     result = llm_chat(
         [{"role": "user", "content": prompt}],
         settings,
+        use_cache=use_cache,
+        validate=parse_llm_json,
     )
 
     # Parse JSON from response
     try:
-        # Strip markdown fences if present
-        cleaned = result.strip()
-        if cleaned.startswith("```"):
-            cleaned = cleaned.split("\n", 1)[1]
-            if cleaned.endswith("```"):
-                cleaned = cleaned.rsplit("```", 1)[0]
-        return json.loads(cleaned)
+        return parse_llm_json(result)
     except json.JSONDecodeError:
         return {
             "strengths": [],
@@ -109,28 +151,64 @@ RESUME:
         }
 
 
+def find_extracted_text(conn, sha256: str) -> str | None:
+    """Text already extracted from an identical upload, if there is one."""
+    row = conn.execute(
+        "SELECT content_text FROM resumes WHERE content_sha256 = ? AND content_text IS NOT NULL "
+        "AND content_text NOT LIKE '[% extraction failed:%' LIMIT 1",
+        (sha256,),
+    ).fetchone()
+    return row["content_text"] if row else None
+
+
+def batch_analyze(texts: list[str], settings: dict, use_cache: bool = True) -> list:
+    """Analyze several resumes with their LLM calls running concurrently.
+
+    Up to settings["llm_concurrency"] requests are in flight at once. Returns
+    one entry per text, in order: the analysis dict, or the exception raised.
+    use_cache is passed through to analyze_resume.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not texts:
+        return []
+
+    def _one(text):
+        try:
+            return analyze_resume(text, settings, use_cache)
+        except Exception as e:
+            return e
+
+    workers = max(1, min(int(settings.get("llm_concurrency", 4)), len(texts)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_one, texts))
+
+
 def insert_resume(conn, metadata: dict, content_text: str) -> int:
     """Insert a resume record into the database."""
-    cursor = conn.execute(
-        """INSERT INTO resumes (filename, original_name, file_path, file_type, content_text, uploaded_at)
-           VALUES (?, ?, ?, ?, ?, ?)""",
-        (
-            metadata["filename"],
-            metadata["original_name"],
-            metadata["file_path"],
-            metadata["file_type"],
-            content_text,
-            datetime.now().isoformat(),
-        ),
-    )
-    conn.commit()
+    with batch(conn):
+        cursor = conn.execute(
+            """INSERT INTO resumes (filename, original_name, file_path, file_type, content_text,
+                                    content_sha256, uploaded_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (
+                metadata["filename"],
+                metadata["original_name"],
+                metadata["file_path"],
+                metadata["file_type"],
+                content_text,
+                metadata.get("sha256"),
+                datetime.now().isoformat(),
+            ),
+        )
     return cursor.lastrowid
 
 
-def get_resumes(conn) -> list[dict]:
-    """Get all resumes."""
+def get_resumes(conn, columns: str = RESUME_LIST_COLUMNS) -> list[dict]:
+    """Get all resumes, newest first. Pass columns="*" for full rows."""
+    # ids are assigned in upload order, so the rowid B-tree gives newest-first without a sort
     rows = conn.execute(
-        "SELECT * FROM resumes ORDER BY uploaded_at DESC"
+        f"SELECT {columns} FROM resumes ORDER BY id DESC"
     ).fetchall()
     return [dict(r) for r in rows]
 
@@ -144,32 +222,33 @@ def get_resume(conn, resume_id: int) -> dict | None:
 def update_resume_analysis(conn, resume_id: int, analysis: dict) -> bool:
     """Store analysis results on a resume."""
     best_for = analysis.get("target_roles", [])
-    conn.execute(
-        "UPDATE resumes SET analysis = ?, best_for = ? WHERE id = ?",
-        (json.dumps(analysis), json.dumps(best_for), resume_id),
-    )
-    conn.commit()
+    with batch(conn):
+        conn.execute(
+            "UPDATE resumes SET analysis = ?, best_for = ? WHERE id = ?",
+            (json.dumps(analysis), json.dumps(best_for), resume_id),
+        )
     return True
 
 
-def synthesize_candidate_profile(conn, settings: dict) -> dict:
+def synthesize_candidate_profile(conn, settings: dict, use_cache: bool = True) -> dict:
     """Combine all resume analyses into a unified candidate profile."""
-    from services.llm import llm_chat
+    from services.llm import llm_chat, parse_llm_json
 
-    # Gather all resume content texts
+    # Gather all resume content texts — only the 4000 characters the prompt uses
     rows = conn.execute(
-        "SELECT id, original_name, content_text, analysis FROM resumes ORDER BY id"
+        "SELECT id, original_name, substr(content_text, 1, 4000) AS snippet, analysis "
+        "FROM resumes ORDER BY id"
     ).fetchall()
 
     if not rows:
         return {"error": "No resumes uploaded"}
 
     # Build a combined view of all resumes for the LLM
-    combined = ""
+    parts = []
     for r in rows:
-        combined += f"\n--- RESUME: {r['original_name']} ---\n"
-        text = r["content_text"] or ""
-        combined += text[:4000] + "\n"
+        parts.append(f"\n--- RESUME: {r['original_name']} ---\n")
+        parts.append((r["snippet"] or "") + "\n")
+    combined = "".join(parts)
 
     # Also include any existing per-resume analyses as extra signal
     analyses = []
@@ -182,9 +261,9 @@ def synthesize_candidate_profile(conn, settings: dict) -> dict:
 
     analysis_summary = ""
     if analyses:
-        analysis_summary = "\n\nPREVIOUS PER-RESUME ANALYSES (for reference):\n"
-        for i, a in enumerate(analyses):
-            analysis_summary += f"\nResume {i+1}: {json.dumps(a, indent=2)[:1500]}\n"
+        analysis_summary = "\n\nPREVIOUS PER-RESUME ANALYSES (for reference):\n" + "".join(
+            f"\nResume {i+1}: {json.dumps(a, indent=2)[:1500]}\n" for i, a in enumerate(analyses)
+        )
 
     prompt = """You are building a comprehensive candidate profile from multiple resumes belonging to the SAME person. These resumes target different roles and industries, so together they paint the complete picture.
 
@@ -214,16 +293,13 @@ RESUMES:
     result = llm_chat(
         [{"role": "user", "content": prompt}],
         settings,
+        use_cache=use_cache,
+        validate=parse_llm_json,
     )
 
     # Parse JSON
     try:
-        cleaned = result.strip()
-        if cleaned.startswith("```"):
-            cleaned = cleaned.split("\n", 1)[1]
-            if cleaned.endswith("```"):
-                cleaned = cleaned.rsplit("```", 1)[0]
-        profile = json.loads(cleaned)
+        profile = parse_llm_json(result)
     except json.JSONDecodeError:
         profile = {
             "headline": "Profile synthesis failed — raw response saved",
@@ -232,24 +308,52 @@ RESUMES:
         }
 
     # Save to disk
-    profile_path = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)), "data", "candidate_profile.json"
-    )
-    with open(profile_path, "w") as f:
-        json.dump(profile, f, indent=2)
+    _write_profile(profile)
 
     return profile
 
 
+def _write_profile(profile: dict) -> None:
+    """Write the profile atomically: a crash mid-write leaves the previous file intact."""
+    tmp_path = PROFILE_PATH + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(profile, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, PROFILE_PATH)
+    except BaseException:
+        # Don't let a failed cleanup mask the original error
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+# Parsed candidate profile, reused until the file changes on disk
+_profile_cache = None
+_profile_cache_key = None
+
+
 def load_candidate_profile() -> dict | None:
-    """Load the synthesized candidate profile if it exists."""
-    profile_path = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)), "data", "candidate_profile.json"
-    )
-    if os.path.exists(profile_path):
-        with open(profile_path) as f:
-            return json.load(f)
-    return None
+    """Load the synthesized candidate profile if it exists.
+
+    The parsed profile is cached and re-read when the file's mtime or size
+    changes, so callers should treat the returned dict as read-only.
+    """
+    global _profile_cache, _profile_cache_key
+    try:
+        st = os.stat(PROFILE_PATH)
+    except OSError:
+        return None
+    key = (st.st_mtime_ns, st.st_size)
+    if _profile_cache is not None and key == _profile_cache_key:
+        return _profile_cache
+
+    with open(PROFILE_PATH) as f:
+        profile = json.load(f)
+    _profile_cache = profile
+    _profile_cache_key = key
+    return profile
 
 
 def validate_candidate_profile(profile: dict = None) -> list[str]:
@@ -275,11 +379,7 @@ def validate_candidate_profile(profile: dict = None) -> list[str]:
 
 def save_candidate_profile(data: dict) -> None:
     """Save updated candidate profile to disk."""
-    profile_path = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)), "data", "candidate_profile.json"
-    )
-    with open(profile_path, "w") as f:
-        json.dump(data, f, indent=2)
+    _write_profile(data)
 
 
 def delete_resume(conn, resume_id: int) -> bool:
@@ -290,6 +390,6 @@ def delete_resume(conn, resume_id: int) -> bool:
     # Delete file
     if resume["file_path"] and os.path.exists(resume["file_path"]):
         os.remove(resume["file_path"])
-    conn.execute("DELETE FROM resumes WHERE id = ?", (resume_id,))
-    conn.commit()
+    with batch(conn):
+        conn.execute("DELETE FROM resumes WHERE id = ?", (resume_id,))
     return True
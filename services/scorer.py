@@ -3,10 +3,34 @@ Job scoring — LLM rates jobs 0-100 against the candidate profile and search pr
 """
 
 import json
-from services.llm import llm_chat
+from concurrent.futures import ThreadPoolExecutor
+
+from services.db import batch
+from services.llm import llm_chat, parse_llm_json
 from services.resumes import load_candidate_profile
 from services.settings import load_settings
 
+# How long a cached completion stays reusable, per call type (see llm_chat max_age_days).
+# Scores only change when the prompt does; prep and suggestions are worth refreshing.
+# Only replies that parse are stored, and force/regenerate paths pass use_cache=False.
+SCORE_CACHE_DAYS = 30
+PREP_CACHE_DAYS = 7
+
+# Columns score_jobs loads: what score_job reads, plus id and score
+SCORE_COLUMNS = "id, title, company, location, industry, salary_text, source, description, score"
+
+# Scored rows written per transaction in score_jobs
+SCORE_FLUSH_ROWS = 50
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Slice text to limit chars, snapping back to a sentence or line end in the last 10%."""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    end = max(cut.rfind(". ", int(limit * 0.9)), cut.rfind("\n", int(limit * 0.9)))
+    return cut[:end + 1] if end != -1 else cut
+
 
 def _scoring_settings(settings: dict) -> dict:
     """Build a settings dict that routes LLM calls through the scoring model."""
@@ -34,7 +58,7 @@ def parse_job_posting_text(raw_text: str, url: str, settings: dict) -> dict:
     and we only have raw body text.
     """
     # Truncate to avoid blowing up context
-    truncated = raw_text[:8000]
+    truncated = _truncate(raw_text, 8000)
 
     prompt = f"""Extract job posting details from this page text. The page URL is: {url}
 
@@ -51,40 +75,29 @@ If you cannot identify a job posting in this text, return:
     result = llm_chat(
         [{"role": "user", "content": prompt}],
         score_settings,
+        max_age_days=SCORE_CACHE_DAYS,
+        json_mode=True,
+        validate=parse_llm_json,
     )
 
     try:
-        cleaned = result.strip()
-        if cleaned.startswith("```"):
-            cleaned = cleaned.split("\n", 1)[1]
-            if cleaned.endswith("```"):
-                cleaned = cleaned.rsplit("```", 1)[0]
-        return json.loads(cleaned)
+        return parse_llm_json(result)
     except (json.JSONDecodeError, ValueError):
         return {"error": "Failed to parse LLM response"}
 
 
-def score_job(job: dict, settings: dict, profile: dict = None) -> dict:
-    """Score a single job against the candidate profile. Returns score dict."""
-    if not profile:
-        profile = load_candidate_profile()
+def _without(items: list, exclude: list) -> list:
+    """items minus anything in exclude (case-insensitive), order kept."""
+    seen = {str(x).strip().lower() for x in exclude}
+    return [x for x in items if str(x).strip().lower() not in seen]
 
-    if not profile:
-        return {"score": 0, "pros": [], "cons": ["No candidate profile available"], "fit_summary": "Cannot score without a candidate profile."}
 
-    # Quick dealbreaker check (keyword match, no LLM needed)
-    dealbreakers = settings.get("candidate_dealbreakers", [])
-    job_text = f"{job.get('title', '')} {job.get('description', '')} {job.get('company', '')}".lower()
-    for db in dealbreakers:
-        if db.lower() in job_text:
-            return {
-                "score": 0,
-                "pros": [],
-                "cons": [f"Dealbreaker: contains '{db}'"],
-                "fit_summary": f"Auto-rejected: job contains dealbreaker keyword '{db}'.",
-            }
+def _score_system_prompt(profile: dict, settings: dict) -> str:
+    """The part of the scoring prompt that is the same for every job in a run.
 
-    # Build the scoring prompt
+    Sent as the system message ahead of the per-job posting, so providers with
+    prompt caching can reuse the prefix across a batch.
+    """
     prefs = {
         "location": settings.get("candidate_location", ""),
         "radius_miles": settings.get("candidate_radius_miles", 30),
@@ -97,41 +110,34 @@ def score_job(job: dict, settings: dict, profile: dict = None) -> dict:
         "willing_to_travel": settings.get("candidate_willing_to_travel", 10),
     }
 
-    job_info = (
-        f"Title: {job.get('title', 'Unknown')}\n"
-        f"Company: {job.get('company', 'Unknown')}\n"
-        f"Location: {job.get('location', 'Unknown')}\n"
-        f"Industry: {job.get('industry', 'Unknown')}\n"
-        f"Salary: {job.get('salary_text', 'Not listed')}\n"
-        f"Source: {job.get('source', 'Unknown')}\n"
-        f"Description:\n{(job.get('description', '') or '')[:3000]}"
-    )
+    # Skip what another line already says, so no tokens go to repeats
+    core_strengths = profile.get("core_strengths", [])
+    skills = _without(profile.get("all_skills", [])[:20], core_strengths)
+    extra_roles = _without(prefs["target_roles"], profile.get("target_roles", []))
+    projects = settings.get("candidate_technical_projects", "")
+    projects_line = f"\nTechnical Projects/Homelab: {projects}" if projects else ""
 
-    prompt = f"""You are a job match analyst. Score how well this job matches the candidate on a scale of 0-100.
+    return f"""You are a job match analyst. Score how well the job posting in the user message matches the candidate on a scale of 0-100.
 
 CANDIDATE PROFILE:
 Name: {profile.get('name', 'Unknown')}
 Headline: {profile.get('headline', '')}
 Experience: {profile.get('experience_years', 0)}+ years, {profile.get('experience_level', 'unknown')} level
-Core Strengths: {', '.join(profile.get('core_strengths', []))}
-Skills: {', '.join(profile.get('all_skills', [])[:20])}
+Core Strengths: {', '.join(core_strengths)}
+Skills: {', '.join(skills)}
 Industries: {', '.join(profile.get('industries', []))}
 Target Roles: {', '.join(profile.get('target_roles', []))}
-Unique Value: {profile.get('unique_value', '')}
-{f"Technical Projects/Homelab: {settings.get('candidate_technical_projects', '')}" if settings.get('candidate_technical_projects') else ''}
+Unique Value: {profile.get('unique_value', '')}{projects_line}
 
 SEARCH PREFERENCES:
 Preferred Location: {prefs['location']} (within {prefs['radius_miles']} miles)
 Salary Range: ${prefs['salary_min']:,} - ${prefs['salary_max']:,}{' (flexible on upper)' if prefs['salary_max'] == 0 else ''}
 Work Mode: {prefs['work_mode']}
-Target Roles: {', '.join(prefs['target_roles']) if prefs['target_roles'] else 'See candidate profile'}
+Target Roles: {', '.join(extra_roles) if extra_roles else 'See candidate profile'}
 Target Industries: {', '.join(prefs['target_industries']) if prefs['target_industries'] else 'See candidate profile'}
 Nice-to-Haves: {', '.join(prefs['nice_to_haves']) if prefs['nice_to_haves'] else 'None specified'}
 Max Travel: {prefs['willing_to_travel']}%
 
-JOB POSTING:
-{job_info}
-
 SCORING GUIDE:
 - 90-100: Perfect match — right role, right location, right pay, strong skill overlap
 - 70-89: Strong match — most criteria met, worth applying
@@ -162,26 +168,73 @@ ALSO PROVIDE:
 Return ONLY valid JSON (no markdown fences):
 {{"score": 0, "pros": ["pro 1", "pro 2", "pro 3"], "cons": ["con 1", "con 2"], "fit_summary": "One sentence.", "summary": "Two sentences.", "ghost_risk": "low", "keyword_match": [{{"keyword": "Project Management", "category": "hard_skill", "matched": true}}], "gaps": [{{"gap": "PMP certification", "transferable": "20 years of project coordination experience"}}], "salary_estimate": "$65,000 - $85,000"}}"""
 
+
+def _parse_score(result: str) -> dict:
+    """Parse a scoring reply, clamping score to an int 0-100. Raises if the reply is unusable."""
+    data = parse_llm_json(result)
+    data["score"] = max(0, min(100, int(data.get("score", 0))))
+    return data
+
+
+def score_job(job: dict, settings: dict, profile: dict = None, system_prompt: str = None,
+              score_settings: dict = None, use_cache: bool = True) -> dict:
+    """Score a single job against the candidate profile. Returns score dict.
+
+    system_prompt, score_settings: prebuilt _score_system_prompt(profile, settings)
+    and _scoring_settings(settings), so batch callers build them once per run
+    instead of once per job.
+    use_cache: False re-asks the LLM instead of reusing a stored score (re-score).
+    """
+    if not profile:
+        profile = load_candidate_profile()
+
+    if not profile:
+        return {"score": 0, "pros": [], "cons": ["No candidate profile available"], "fit_summary": "Cannot score without a candidate profile."}
+
+    # Quick dealbreaker check (keyword match, no LLM needed)
+    dealbreakers = settings.get("candidate_dealbreakers", [])
+    job_text = f"{job.get('title', '')} {job.get('description', '')} {job.get('company', '')}".lower()
+    for db in dealbreakers:
+        if db.lower() in job_text:
+            return {
+                "score": 0,
+                "pros": [],
+                "cons": [f"Dealbreaker: contains '{db}'"],
+                "fit_summary": f"Auto-rejected: job contains dealbreaker keyword '{db}'.",
+            }
+
+    if system_prompt is None:
+        system_prompt = _score_system_prompt(profile, settings)
+
+    job_info = (
+        f"Title: {job.get('title', 'Unknown')}\n"
+        f"Company: {job.get('company', 'Unknown')}\n"
+        f"Location: {job.get('location', 'Unknown')}\n"
+        f"Industry: {job.get('industry', 'Unknown')}\n"
+        f"Salary: {job.get('salary_text', 'Not listed')}\n"
+        f"Source: {job.get('source', 'Unknown')}\n"
+        f"Description:\n{_truncate(job.get('description', '') or '', 3000)}"
+    )
+
     # Use the scoring-specific model (cheaper/faster than the analysis model)
-    score_settings = _scoring_settings(settings)
+    if score_settings is None:
+        score_settings = _scoring_settings(settings)
 
     result = llm_chat(
-        [{"role": "user", "content": prompt}],
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"JOB POSTING:\n{job_info}"},
+        ],
         score_settings,
+        use_cache=use_cache,
+        max_age_days=SCORE_CACHE_DAYS,
+        json_mode=True,
+        validate=_parse_score,
     )
 
-    # Parse JSON
     try:
-        cleaned = result.strip()
-        if cleaned.startswith("```"):
-            cleaned = cleaned.split("\n", 1)[1]
-            if cleaned.endswith("```"):
-                cleaned = cleaned.rsplit("```", 1)[0]
-        data = json.loads(cleaned)
-        # Ensure score is int 0-100
-        data["score"] = max(0, min(100, int(data.get("score", 0))))
-        return data
-    except (json.JSONDecodeError, ValueError):
+        return _parse_score(result)
+    except (json.JSONDecodeError, ValueError, TypeError):
         return {
             "score": 0,
             "pros": [],
@@ -191,7 +244,10 @@ Return ONLY valid JSON (no markdown fences):
 
 
 def score_jobs(conn, settings: dict = None, job_ids: list = None, force: bool = False) -> dict:
-    """Score multiple jobs. Returns summary of results."""
+    """Score multiple jobs. Returns summary of results.
+
+    force: re-score jobs that already have a score, asking the LLM afresh.
+    """
     if not settings:
         settings = load_settings()
 
@@ -199,31 +255,62 @@ def score_jobs(conn, settings: dict = None, job_ids: list = None, force: bool =
     if not profile:
         return {"error": "No candidate profile. Analyze resumes first.", "scored": 0}
 
-    # Get jobs to score
+    # Get jobs to score — only the columns score_job reads, plus id/score for the loop
     if job_ids:
         placeholders = ",".join("?" * len(job_ids))
-        rows = conn.execute(f"SELECT * FROM jobs WHERE id IN ({placeholders})", job_ids).fetchall()
+        cursor = conn.execute(f"SELECT {SCORE_COLUMNS} FROM jobs WHERE id IN ({placeholders})", job_ids)
     elif force:
-        rows = conn.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+        cursor = conn.execute(f"SELECT {SCORE_COLUMNS} FROM jobs ORDER BY id")
     else:
-        rows = conn.execute("SELECT * FROM jobs WHERE score IS NULL ORDER BY id").fetchall()
+        cursor = conn.execute(f"SELECT {SCORE_COLUMNS} FROM jobs WHERE score IS NULL ORDER BY id")
 
-    jobs = [dict(r) for r in rows]
     results = {"scored": 0, "skipped": 0, "errors": []}
 
-    for job in jobs:
-        if job.get("score") is not None and not force:
+    pending = []
+    for row in cursor:
+        if row["score"] is not None and not force:
             results["skipped"] += 1
-            continue
+        else:
+            pending.append(dict(row))
+
+    # Everything that only depends on the profile and settings is built once per run
+    system_prompt = _score_system_prompt(profile, settings)
+    score_settings = _scoring_settings(settings)
 
+    def _one(job):
         try:
-            score_data = score_job(job, settings, profile)
-            conn.execute(
-                """UPDATE jobs SET score = ?, pros = ?, cons = ?, fit_summary = ?,
-                   score_details = ?, summary = ?, ghost_risk = ?, keyword_match = ?,
-                   salary_estimate = ?, updated_at = datetime('now')
-                   WHERE id = ?""",
-                (
+            return score_job(job, settings, profile, system_prompt, score_settings,
+                             use_cache=not force), None
+        except Exception as e:
+            return None, e
+
+    # LLM calls overlap on worker threads; the sqlite writes stay on this thread,
+    # buffered and flushed SCORE_FLUSH_ROWS at a time in one transaction each
+    updates = []
+
+    def _flush():
+        try:
+            with batch(conn):
+                conn.executemany(
+                    """UPDATE jobs SET score = ?, pros = ?, cons = ?, fit_summary = ?,
+                       score_details = ?, summary = ?, ghost_risk = ?, keyword_match = ?,
+                       salary_estimate = ?, updated_at = datetime('now')
+                       WHERE id = ?""",
+                    updates,
+                )
+            results["scored"] += len(updates)
+        except Exception as e:
+            results["errors"].append(f"Failed to save {len(updates)} scores: {str(e)}")
+        updates.clear()
+
+    workers = max(1, min(int(settings.get("llm_concurrency", 4)), len(pending)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for job, (score_data, err) in zip(pending, pool.map(_one, pending)):
+            if err is not None:
+                results["errors"].append(f"Job {job['id']} ({job.get('title', '?')}): {str(err)}")
+                continue
+            try:
+                updates.append((
                     score_data["score"],
                     json.dumps(score_data.get("pros", [])),
                     json.dumps(score_data.get("cons", [])),
@@ -234,12 +321,13 @@ def score_jobs(conn, settings: dict = None, job_ids: list = None, force: bool =
                     json.dumps(score_data.get("keyword_match", [])),
                     score_data.get("salary_estimate"),
                     job["id"],
-                ),
-            )
-            conn.commit()
-            results["scored"] += 1
-        except Exception as e:
-            results["errors"].append(f"Job {job['id']} ({job.get('title', '?')}): {str(e)}")
+                ))
+            except Exception as e:
+                results["errors"].append(f"Job {job['id']} ({job.get('title', '?')}): {str(e)}")
+            if len(updates) >= SCORE_FLUSH_ROWS:
+                _flush()
+    if updates:
+        _flush()
 
     # Auto-archive low-scoring new jobs (if threshold is set)
     auto_threshold = settings.get("auto_archive_threshold", 0)
@@ -256,8 +344,12 @@ def score_jobs(conn, settings: dict = None, job_ids: list = None, force: bool =
     return results
 
 
-def generate_interview_prep(job: dict, settings: dict = None, profile: dict = None) -> dict:
-    """Generate interview preparation questions and talking points for a job."""
+def generate_interview_prep(job: dict, settings: dict = None, profile: dict = None,
+                            use_cache: bool = True) -> dict:
+    """Generate interview preparation questions and talking points for a job.
+
+    use_cache: False asks the LLM for new prep instead of a stored one (Regenerate Prep).
+    """
     if not settings:
         settings = load_settings()
     if not profile:
@@ -270,10 +362,11 @@ def generate_interview_prep(job: dict, settings: dict = None, profile: dict = No
         f"Title: {job.get('title', 'Unknown')}\n"
         f"Company: {job.get('company', 'Unknown')}\n"
         f"Location: {job.get('location', 'Unknown')}\n"
-        f"Description:\n{(job.get('description', '') or '')[:3000]}"
+        f"Description:\n{_truncate(job.get('description', '') or '', 3000)}"
     )
 
-    prompt = f"""You are an expert interview coach. Generate interview preparation materials for this specific job.
+    # Static candidate/instructions first, the job last, so the prefix is cacheable
+    system_prompt = f"""You are an expert interview coach. Generate interview preparation materials for the job in the user message.
 
 CANDIDATE:
 {profile.get('name', 'Unknown')} — {profile.get('headline', '')}
@@ -284,9 +377,6 @@ Skills: {', '.join(profile.get('all_skills', [])[:20])}
 Work History:
 {chr(10).join(f"- {j['title']} @ {j['company']} ({j['duration']})" for j in profile.get('work_history', [])[:5])}
 
-JOB:
-{job_info}
-
 Generate:
 1. 5 behavioral questions they're likely to ask (with a suggested talking point from the candidate's experience for each)
 2. 5 technical/role-specific questions (with suggested answers based on the candidate's background)
@@ -310,23 +400,28 @@ Return ONLY valid JSON (no markdown fences):
 }}"""
 
     result = llm_chat(
-        [{"role": "user", "content": prompt}],
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"JOB:\n{job_info}"},
+        ],
         settings,
+        use_cache=use_cache,
+        max_age_days=PREP_CACHE_DAYS,
+        json_mode=True,
+        validate=parse_llm_json,
     )
 
     try:
-        cleaned = result.strip()
-        if cleaned.startswith("```"):
-            cleaned = cleaned.split("\n", 1)[1]
-            if cleaned.endswith("```"):
-                cleaned = cleaned.rsplit("```", 1)[0]
-        return json.loads(cleaned)
+        return parse_llm_json(result)
     except json.JSONDecodeError:
         return {"error": "Failed to parse interview prep", "raw": result[:500]}
 
 
-def suggest_searches(settings: dict = None, profile: dict = None) -> dict:
-    """Use AI to suggest search queries and target companies based on candidate profile."""
+def suggest_searches(settings: dict = None, profile: dict = None, use_cache: bool = True) -> dict:
+    """Use AI to suggest search queries and target companies based on candidate profile.
+
+    use_cache: False asks the LLM for new suggestions instead of stored ones.
+    """
     if not settings:
         settings = load_settings()
     if not profile:
@@ -383,14 +478,13 @@ Return ONLY valid JSON (no markdown fences):
     result = llm_chat(
         [{"role": "user", "content": prompt}],
         settings,
+        use_cache=use_cache,
+        max_age_days=PREP_CACHE_DAYS,
+        json_mode=True,
+        validate=parse_llm_json,
     )
 
     try:
-        cleaned = result.strip()
-        if cleaned.startswith("```"):
-            cleaned = cleaned.split("\n", 1)[1]
-            if cleaned.endswith("```"):
-                cleaned = cleaned.rsplit("```", 1)[0]
-        return json.loads(cleaned)
+        return parse_llm_json(result)
     except json.JSONDecodeError:
         return {"error": "Failed to parse suggestions", "raw": result[:500]}
@@ -5,8 +5,11 @@ Supports: Indeed, SimplyHired, Rigzone.
 
 import logging
 import random
+import threading
 import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from playwright.sync_api import sync_playwright
 
@@ -21,6 +24,10 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
 ]
 
+# Resource types no scraper reads; aborted before download. Stylesheets still load:
+# the SimplyHired/ZipRecruiter scrapers click through cards and need real layout.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
 # Board scraper registry — maps board name to scrape function
 BOARD_SCRAPERS = {}
 
@@ -30,12 +37,24 @@ def _random_delay(min_s=3, max_s=8):
     time.sleep(random.uniform(min_s, max_s))
 
 
-def _launch_browser(playwright):
-    """Launch a stealth headless browser. Returns (browser, context)."""
-    browser = playwright.chromium.launch(
+def _launch_chromium(playwright):
+    """Launch the stealth headless Chromium."""
+    return playwright.chromium.launch(
         headless=True,
         args=["--no-sandbox", "--disable-blink-features=AutomationControlled"],
     )
+
+
+def _block_heavy_resources(route):
+    """Abort images, media and fonts; let everything else through."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _new_context(browser):
+    """Open a fresh context (own cookies, random user agent) with the webdriver patches."""
     context = browser.new_context(
         user_agent=random.choice(USER_AGENTS),
         viewport={"width": 1920, "height": 1080},
@@ -45,7 +64,82 @@ def _launch_browser(playwright):
         Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
         Object.defineProperty(navigator, 'plugins', { get: () => [1, 2, 3, 4, 5] });
     """)
-    return browser, context
+    context.route("**/*", _block_heavy_resources)
+    return context
+
+
+# Browser shared by the scrapers running on this thread inside shared_browser().
+# Playwright's sync API is bound to the thread that started it, so it's per thread.
+_thread_browser = threading.local()
+
+
+@contextmanager
+def shared_browser():
+    """Let every Playwright scrape inside the block reuse one Chromium.
+
+    The browser is launched on first use and closed on exit; each scrape still
+    gets its own context. Nested blocks join the outer one.
+    """
+    if getattr(_thread_browser, "slot", None) is not None:
+        yield
+        return
+    slot = _thread_browser.slot = {}
+    try:
+        yield
+    finally:
+        _thread_browser.slot = None
+        if "browser" in slot:
+            slot["browser"].close()
+            slot["playwright"].stop()
+
+
+@contextmanager
+def _browser_page():
+    """Yield a page in a fresh stealth context, on the shared browser if one is open."""
+    slot = getattr(_thread_browser, "slot", None)
+    if slot is None:
+        # No shared browser: launch one just for this scrape
+        with sync_playwright() as p:
+            browser = _launch_chromium(p)
+            try:
+                yield _new_context(browser).new_page()
+            finally:
+                browser.close()
+        return
+
+    if "browser" not in slot:
+        playwright = sync_playwright().start()
+        try:
+            slot["browser"] = _launch_chromium(playwright)
+        except Exception:
+            playwright.stop()
+            raise
+        slot["playwright"] = playwright
+    context = _new_context(slot["browser"])
+    try:
+        yield context.new_page()
+    finally:
+        context.close()
+
+
+def _open_result_pages(first_page, urls: list[str]) -> list[tuple]:
+    """Start every result-page URL loading at once, one tab each in first_page's context.
+
+    goto only waits for the first response, so the browser downloads the later
+    pages while the caller reads the earlier ones. Returns [(page, error)] in URL
+    order; error is that page's navigation exception, or None.
+    """
+    pages = [first_page] + [first_page.context.new_page() for _ in urls[1:]]
+    opened = []
+    for i, (page, url) in enumerate(zip(pages, urls)):
+        try:
+            page.goto(url, wait_until="commit", timeout=30000)
+            opened.append((page, None))
+        except Exception as e:
+            opened.append((page, e))
+        if i < len(urls) - 1:
+            _random_delay(1, 2)  # stagger the requests a little
+    return opened
 
 
 def _build_indeed_url(query: str, location: str, radius_miles: int = 30,
@@ -77,24 +171,23 @@ def scrape_indeed(profile: dict, max_pages: int = 3) -> list[dict]:
     radius = profile.get("radius_miles", 30)
     salary_min = profile.get("salary_min", 0)
 
-    if not query:
+    if not query or max_pages < 1:
         return []
 
     jobs = []
 
-    with sync_playwright() as p:
-        browser, context = _launch_browser(p)
-        page = context.new_page()
-
-        for page_num in range(max_pages):
-            start = page_num * 10
-            url = _build_indeed_url(query, location, radius, salary_min, start)
+    with _browser_page() as first_page:
+        # Result pages are independent URLs, so they all load in parallel tabs
+        urls = [_build_indeed_url(query, location, radius, salary_min, n * 10) for n in range(max_pages)]
+        opened = _open_result_pages(first_page, urls)
+        _random_delay(2, 5)
 
+        for page_num, (page, load_error) in enumerate(opened):
             logger.info(f"Indeed: page {page_num + 1}, query='{query}', location='{location}'")
 
             try:
-                page.goto(url, wait_until="domcontentloaded", timeout=30000)
-                _random_delay(2, 5)
+                if load_error:
+                    raise load_error
 
                 # Wait for job cards to appear
                 page.wait_for_selector("div.job_seen_beacon, div.jobsearch-ResultsList", timeout=15000)
@@ -104,10 +197,8 @@ def scrape_indeed(profile: dict, max_pages: int = 3) -> list[dict]:
                 break
 
             # Extract job cards
-            cards = page.query_selector_all("div.job_seen_beacon")
-            if not cards:
-                # Try alternate selector
-                cards = page.query_selector_all("div.cardOutline")
+            extracted = page.evaluate(_INDEED_CARDS_JS)
+            cards = extracted["cards"]
 
             if not cards:
                 logger.info(f"No job cards found on page {page_num + 1}")
@@ -117,7 +208,7 @@ def scrape_indeed(profile: dict, max_pages: int = 3) -> list[dict]:
 
             for card in cards:
                 try:
-                    job = _extract_indeed_card(card, page)
+                    job = _extract_indeed_card(card, extracted["panel"])
                     if job and job.get("url"):
                         job["source"] = "indeed"
                         job["scraped_at"] = datetime.now().isoformat()
@@ -132,83 +223,75 @@ def scrape_indeed(profile: dict, max_pages: int = 3) -> list[dict]:
                 logger.info("No next page button found, stopping")
                 break
 
-            if page_num < max_pages - 1:
-                _random_delay(3, 7)
-
-        browser.close()
-
     logger.info(f"Indeed scrape complete: {len(jobs)} jobs found for '{query}' in '{location}'")
     return jobs
 
 
-def _extract_indeed_card(card, page) -> dict | None:
-    """Extract job data from a single Indeed job card element."""
-    job = {}
-
-    # Title
-    title_el = card.query_selector("h2.jobTitle a, h2 a, a[data-jk]")
-    if title_el:
-        job["title"] = (title_el.inner_text() or "").strip()
-        href = title_el.get_attribute("href") or ""
-        if href.startswith("/"):
-            href = "https://www.indeed.com" + href
-        # Clean URL — remove tracking params, keep the job key
-        if "jk=" in href or "/viewjob" in href:
-            job["url"] = href.split("&")[0] if "&" in href else href
-        else:
-            job["url"] = href
-    else:
+# Reads every Indeed card (and the side-panel description) in one browser
+# round-trip instead of several query_selector/inner_text calls per card.
+_INDEED_CARDS_JS = """() => {
+    const text = (root, sel) => {
+        const el = root.querySelector(sel);
+        return el ? (el.innerText || "").trim() : null;
+    };
+    let cards = document.querySelectorAll("div.job_seen_beacon");
+    if (!cards.length) cards = document.querySelectorAll("div.cardOutline");
+    const panel = text(document, "#jobDescriptionText, .jobsearch-JobComponent-description");
+    return {
+        panel: panel,
+        cards: Array.from(cards).map(c => {
+            const link = c.querySelector("h2.jobTitle a, h2 a, a[data-jk]");
+            return {
+                title: link ? (link.innerText || "").trim() : null,
+                href: link ? link.getAttribute("href") || "" : null,
+                company: text(c, '[data-testid="company-name"], .companyName, .company_location .companyName'),
+                location: text(c, '[data-testid="text-location"], .companyLocation, .company_location .companyLocation'),
+                salary: text(c, '[data-testid="attribute_snippet_testid"], .salary-snippet-container, .metadata .attribute_snippet'),
+                snippet: text(c, '.job-snippet, [data-testid="job-snippet"], .underShelfFooter'),
+            };
+        }),
+    };
+}"""
+
+
+def _extract_indeed_card(fields: dict, panel_text: str | None) -> dict | None:
+    """Build a job dict from one card's fields as returned by _INDEED_CARDS_JS."""
+    if fields.get("title") is None:
         return None
 
-    # Company
-    company_el = card.query_selector('[data-testid="company-name"], .companyName, .company_location .companyName')
-    if company_el:
-        job["company"] = (company_el.inner_text() or "").strip()
+    job = {"title": fields["title"]}
+    href = fields["href"]
+    if href.startswith("/"):
+        href = "https://www.indeed.com" + href
+    # Clean URL — remove tracking params, keep the job key
+    if "jk=" in href or "/viewjob" in href:
+        job["url"] = href.split("&")[0] if "&" in href else href
+    else:
+        job["url"] = href
 
-    # Location
-    location_el = card.query_selector('[data-testid="text-location"], .companyLocation, .company_location .companyLocation')
-    if location_el:
-        job["location"] = (location_el.inner_text() or "").strip()
+    if fields.get("company") is not None:
+        job["company"] = fields["company"]
+    if fields.get("location") is not None:
+        job["location"] = fields["location"]
 
     # Salary (if listed)
-    salary_el = card.query_selector('[data-testid="attribute_snippet_testid"], .salary-snippet-container, .metadata .attribute_snippet')
-    if salary_el:
-        salary_text = (salary_el.inner_text() or "").strip()
+    salary_text = fields.get("salary")
+    if salary_text is not None:
         if "$" in salary_text or "year" in salary_text.lower() or "hour" in salary_text.lower():
             job["salary_text"] = salary_text
 
     # Description snippet
-    snippet_el = card.query_selector('.job-snippet, [data-testid="job-snippet"], .underShelfFooter')
-    if snippet_el:
-        job["description"] = (snippet_el.inner_text() or "").strip()
+    if fields.get("snippet") is not None:
+        job["description"] = fields["snippet"]
 
-    # Try to get the full description by clicking through
-    if job.get("url") and title_el:
-        try:
-            full_desc = _get_full_description(job["url"], page)
-            if full_desc:
-                job["description"] = full_desc
-        except Exception:
-            pass  # Keep the snippet
+    # Indeed shows the full description in a side panel; prefer it over the snippet.
+    # Navigating to each detail page would be slower and risks detection.
+    if job["url"] and panel_text and len(panel_text) > 100:
+        job["description"] = panel_text
 
     return job
 
 
-def _get_full_description(url: str, page) -> str | None:
-    """Try to get full job description from the right-side panel or detail page."""
-    # Indeed shows job details in a side panel when you click a card.
-    # Look for the description in the existing page first (side panel)
-    desc_el = page.query_selector("#jobDescriptionText, .jobsearch-JobComponent-description")
-    if desc_el:
-        text = (desc_el.inner_text() or "").strip()
-        if len(text) > 100:
-            return text
-
-    # If no side panel, we could navigate to the full page, but that's slower
-    # and risks detection. Skip for now — snippet is better than nothing.
-    return None
-
-
 # ═══════════════════════════════════════════════════════════════
 # SimplyHired Scraper
 # ═══════════════════════════════════════════════════════════════
@@ -245,9 +328,7 @@ def scrape_simplyhired(profile: dict, max_pages: int = 2) -> list[dict]:
 
     jobs = []
 
-    with sync_playwright() as p:
-        browser, context = _launch_browser(p)
-        page = context.new_page()
+    with _browser_page() as page:
 
         url = _build_simplyhired_url(query, location, radius, salary_min)
 
@@ -314,8 +395,6 @@ def scrape_simplyhired(profile: dict, max_pages: int = 2) -> list[dict]:
             else:
                 break
 
-        browser.close()
-
     logger.info(f"SimplyHired scrape complete: {len(jobs)} jobs for '{query}' in '{location}'")
     return jobs
 
@@ -391,22 +470,23 @@ def scrape_rigzone(profile: dict, max_pages: int = 2) -> list[dict]:
     query = profile.get("query", "")
     location = profile.get("location", "")
 
-    if not query:
+    if not query or max_pages < 1:
         return []
 
     jobs = []
 
-    with sync_playwright() as p:
-        browser, context = _launch_browser(p)
-        page = context.new_page()
+    with _browser_page() as first_page:
+        # Result pages are numbered URLs, so they all load in parallel tabs
+        urls = [_build_rigzone_url(query, location, n) for n in range(1, max_pages + 1)]
+        opened = _open_result_pages(first_page, urls)
+        _random_delay(2, 5)
 
-        for page_num in range(1, max_pages + 1):
-            url = _build_rigzone_url(query, location, page_num)
+        for page_num, (page, load_error) in enumerate(opened, start=1):
             logger.info(f"Rigzone: page {page_num}, query='{query}', location='{location}'")
 
             try:
-                page.goto(url, wait_until="domcontentloaded", timeout=30000)
-                _random_delay(2, 5)
+                if load_error:
+                    raise load_error
                 page.wait_for_selector("article.update-block", timeout=15000)
             except Exception as e:
                 logger.warning(f"Rigzone page load failed: {e}")
@@ -430,11 +510,6 @@ def scrape_rigzone(profile: dict, max_pages: int = 2) -> list[dict]:
                     logger.warning(f"Failed to extract Rigzone card: {e}")
                     continue
 
-            if page_num < max_pages:
-                _random_delay(3, 7)
-
-        browser.close()
-
     logger.info(f"Rigzone scrape complete: {len(jobs)} jobs for '{query}' in '{location}'")
     return jobs
 
@@ -589,22 +664,25 @@ def scrape_dice(profile: dict, max_pages: int = 2) -> list[dict]:
     location = profile.get("location", "")
     radius = profile.get("radius_miles", 30)
 
-    if not query:
+    if not query or max_pages < 1:
         return []
 
     jobs = []
 
-    with sync_playwright() as p:
-        browser, context = _launch_browser(p)
-        page = context.new_page()
+    with _browser_page() as first_page:
+        # Result pages are numbered URLs, so they all load in parallel tabs
+        urls = [_build_dice_url(query, location, radius, n) for n in range(1, max_pages + 1)]
+        opened = _open_result_pages(first_page, urls)
+        _random_delay(4, 7)
 
-        for page_num in range(1, max_pages + 1):
-            url = _build_dice_url(query, location, radius, page_num)
+        for page_num, (page, load_error) in enumerate(opened, start=1):
             logger.info(f"Dice: page {page_num}, query='{query}', location='{location}'")
 
             try:
-                page.goto(url, wait_until="networkidle", timeout=45000)
-                _random_delay(4, 7)
+                if load_error:
+                    raise load_error
+                # The React app keeps fetching after the first response
+                page.wait_for_load_state("networkidle", timeout=45000)
                 page.wait_for_selector('a[href*="/job-detail/"]', timeout=15000)
             except Exception as e:
                 logger.warning(f"Dice page load failed: {e}")
@@ -685,11 +763,6 @@ def scrape_dice(profile: dict, max_pages: int = 2) -> list[dict]:
                 logger.info(f"No Dice jobs found on page {page_num}")
                 break
 
-            if page_num < max_pages:
-                _random_delay(3, 7)
-
-        browser.close()
-
     logger.info(f"Dice scrape complete: {len(jobs)} jobs for '{query}' in '{location}'")
     return jobs
 
@@ -717,22 +790,23 @@ def scrape_ziprecruiter(profile: dict, max_pages: int = 2) -> list[dict]:
     location = profile.get("location", "")
     radius = profile.get("radius_miles", 25)
 
-    if not query:
+    if not query or max_pages < 1:
         return []
 
     jobs = []
 
-    with sync_playwright() as p:
-        browser, context = _launch_browser(p)
-        page = context.new_page()
+    with _browser_page() as first_page:
+        # Result pages are numbered URLs, so they all load in parallel tabs
+        urls = [_build_ziprecruiter_url(query, location, radius, page=n) for n in range(1, max_pages + 1)]
+        opened = _open_result_pages(first_page, urls)
+        _random_delay(3, 7)
 
-        for page_num in range(1, max_pages + 1):
-            url = _build_ziprecruiter_url(query, location, radius, page=page_num)
+        for page_num, (page, load_error) in enumerate(opened, start=1):
             logger.info(f"ZipRecruiter: page {page_num}, query='{query}', location='{location}'")
 
             try:
-                page.goto(url, wait_until="domcontentloaded", timeout=30000)
-                _random_delay(3, 7)
+                if load_error:
+                    raise load_error
                 # Wait for job cards — ZipRecruiter uses various selectors
                 page.wait_for_selector('.job_result_two_pane, .jobList article, [data-testid="job-result"]', timeout=15000)
             except Exception as e:
@@ -760,11 +834,6 @@ def scrape_ziprecruiter(profile: dict, max_pages: int = 2) -> list[dict]:
                 except Exception as e:
                     logger.warning(f"Failed to extract ZipRecruiter card: {e}")
 
-            if page_num < max_pages:
-                _random_delay(4, 9)
-
-        browser.close()
-
     logger.info(f"ZipRecruiter scrape complete: {len(jobs)} jobs for '{query}' in '{location}'")
     return jobs
 
@@ -839,9 +908,7 @@ def scrape_weworkremotely(profile: dict, max_pages: int = 1) -> list[dict]:
     jobs = []
     seen_urls = set()
 
-    with sync_playwright() as p:
-        browser, context = _launch_browser(p)
-        page = context.new_page()
+    with _browser_page() as page:
 
         for cat_url in categories:
             logger.info(f"WWR: checking {cat_url.split('/')[-1]}")
@@ -903,8 +970,6 @@ def scrape_weworkremotely(profile: dict, max_pages: int = 1) -> list[dict]:
 
             _random_delay(2, 5)
 
-        browser.close()
-
     logger.info(f"WWR scrape complete: {len(jobs)} jobs matched '{query}'")
     return jobs
 
@@ -1067,32 +1132,54 @@ def run_scrape_for_profile(profile: dict, enabled_boards: list = None) -> list[d
     boards = profile.get("boards", ["indeed"])
     all_jobs = []
 
-    for board in boards:
-        # Skip boards that aren't enabled globally
-        if enabled_boards and board not in enabled_boards:
-            continue
+    # One browser for all of this profile's boards (or the caller's, if open)
+    with shared_browser():
+        for board in boards:
+            # Skip boards that aren't enabled globally
+            if enabled_boards and board not in enabled_boards:
+                continue
 
-        scraper = BOARD_SCRAPERS.get(board)
-        if not scraper:
-            logger.info(f"No scraper for board '{board}', skipping")
-            continue
+            scraper = BOARD_SCRAPERS.get(board)
+            if not scraper:
+                logger.info(f"No scraper for board '{board}', skipping")
+                continue
 
-        try:
-            jobs = scraper(profile, max_pages=2)
-            all_jobs.extend(jobs)
-        except Exception as e:
-            logger.error(f"Scraper '{board}' failed for profile: {e}")
+            try:
+                jobs = scraper(profile, max_pages=2)
+                all_jobs.extend(jobs)
+            except Exception as e:
+                logger.error(f"Scraper '{board}' failed for profile: {e}")
 
-        # Delay between boards
-        if board != boards[-1]:
-            _random_delay(5, 10)
+            # Delay between boards
+            if board != boards[-1]:
+                _random_delay(5, 10)
 
     return all_jobs
 
 
+def _scrape_profiles(profiles: list, enabled_boards: list) -> list[tuple]:
+    """Scrape profiles one after another on this thread, sharing one browser.
+
+    Returns [(profile, jobs)] in order; jobs is the exception if the profile failed.
+    """
+    out = []
+    with shared_browser():
+        for profile in profiles:
+            try:
+                logger.info(f"Scraping profile: {profile.get('name', 'unnamed')}")
+                out.append((profile, run_scrape_for_profile(profile, enabled_boards)))
+            except Exception as e:
+                out.append((profile, e))
+
+            # Delay between profiles
+            if profile != profiles[-1]:
+                _random_delay(5, 12)
+    return out
+
+
 def run_single_profile_scrape(profile_index: int, settings: dict) -> dict:
     """Run scrape for a single search profile by index."""
-    from services.db import get_db, upsert_job
+    from services.db import get_db, upsert_jobs_bulk
 
     profiles = settings.get("search_profiles", [])
     if profile_index < 0 or profile_index >= len(profiles):
@@ -1119,6 +1206,7 @@ def run_single_profile_scrape(profile_index: int, settings: dict) -> dict:
         results["jobs_found"] = len(jobs)
 
         excluded = 0
+        to_insert = []
         for job in jobs:
             reason = _should_exclude(job, settings)
             if reason:
@@ -1126,9 +1214,8 @@ def run_single_profile_scrape(profile_index: int, settings: dict) -> dict:
                 logger.debug(f"Excluded: {job.get('title', '?')} — {reason}")
                 continue
             job["search_query"] = campaign_name
-            new_id = upsert_job(conn, job)
-            if new_id > 0:
-                results["jobs_new"] += 1
+            to_insert.append(job)
+        results["jobs_new"] += upsert_jobs_bulk(conn, to_insert)
         if excluded:
             logger.info(f"Anti-filters excluded {excluded} jobs from '{campaign_name}'")
     except Exception as e:
@@ -1143,7 +1230,7 @@ def run_single_profile_scrape(profile_index: int, settings: dict) -> dict:
 
 def run_full_scrape(settings: dict) -> dict:
     """Run scrapes for all enabled search profiles across all enabled boards."""
-    from services.db import get_db, upsert_job
+    from services.db import get_db, upsert_jobs_bulk
 
     profiles = settings.get("search_profiles", [])
     enabled = [p for p in profiles if p.get("enabled", True)]
@@ -1158,18 +1245,27 @@ def run_full_scrape(settings: dict) -> dict:
         "started_at": datetime.now().isoformat(),
     }
 
+    # Profiles are dealt round-robin to a few worker threads, each reusing one
+    # browser for its share; the DB writes stay on this thread
+    workers = max(1, min(int(settings.get("scrape_concurrency", 3)), len(enabled)))
+    groups = [enabled[i::workers] for i in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        scraped = [item for group in pool.map(_scrape_profiles, groups, [enabled_boards] * workers)
+                   for item in group]
+
     conn = get_db()
 
-    for profile in enabled:
+    for profile, jobs in scraped:
         try:
-            logger.info(f"Scraping profile: {profile.get('name', 'unnamed')}")
-            jobs = run_scrape_for_profile(profile, enabled_boards)
+            if isinstance(jobs, Exception):
+                raise jobs
             results["profiles_run"] += 1
             results["jobs_found"] += len(jobs)
 
             # Stamp every job with the search campaign name, apply anti-filters
             campaign_name = profile.get("name", profile.get("query", ""))
             excluded = 0
+            to_insert = []
             for job in jobs:
                 reason = _should_exclude(job, settings)
                 if reason:
@@ -1177,9 +1273,8 @@ def run_full_scrape(settings: dict) -> dict:
                     logger.debug(f"Excluded: {job.get('title', '?')} — {reason}")
                     continue
                 job["search_query"] = campaign_name
-                new_id = upsert_job(conn, job)
-                if new_id > 0:
-                    results["jobs_new"] += 1
+                to_insert.append(job)
+            results["jobs_new"] += upsert_jobs_bulk(conn, to_insert)
             if excluded:
                 logger.info(f"Anti-filters excluded {excluded} jobs from '{campaign_name}'")
 
@@ -1188,10 +1283,6 @@ def run_full_scrape(settings: dict) -> dict:
             logger.error(error_msg)
             results["errors"].append(error_msg)
 
-        # Delay between profiles
-        if profile != enabled[-1]:
-            _random_delay(5, 12)
-
     conn.close()
     results["completed_at"] = datetime.now().isoformat()
 
@@ -1204,7 +1295,7 @@ def run_custom_search(query: str, location: str, settings: dict) -> dict:
     Builds a temporary profile from the given query/location, scrapes,
     stamps search_query, upserts, and scores. Returns summary dict.
     """
-    from services.db import get_db, upsert_job
+    from services.db import get_db, upsert_jobs_bulk
 
     enabled_boards = settings.get("enabled_boards", ["indeed", "simplyhired"])
     profile = {
@@ -1234,15 +1325,15 @@ def run_custom_search(query: str, location: str, settings: dict) -> dict:
 
     conn = get_db()
     excluded = 0
+    to_insert = []
     for job in jobs:
         reason = _should_exclude(job, settings)
         if reason:
             excluded += 1
             continue
         job["search_query"] = query
-        new_id = upsert_job(conn, job)
-        if new_id > 0:
-            results["jobs_new"] += 1
+        to_insert.append(job)
+    results["jobs_new"] += upsert_jobs_bulk(conn, to_insert)
     if excluded:
         results["excluded"] = excluded
 
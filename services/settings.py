@@ -18,12 +18,17 @@ DEFAULTS = {
     # Scoring uses a separate (cheaper/faster) model config
     "scoring_provider": "ollama",              # defaults to free local Ollama
     "scoring_model": "qwen2.5-coder:32b",     # fast enough for JSON scoring
+    "llm_cache_enabled": True,                # reuse stored completions for identical prompts
+    "llm_lru_capacity": 512,                  # completions also kept in memory per process
+    "llm_concurrency": 4,                     # parallel LLM requests for bulk generation
+    "llm_qpm": 0,                             # cap on LLM requests per minute (0 = no cap)
     "pushover_user_key": "",
     "pushover_api_token": "",
     "notify_threshold": 60,
     "auto_archive_threshold": 0,          # 0 = disabled; auto-archive new jobs scoring below this
     "priority_threshold": 80,
     "scrape_interval_hours": 8,
+    "scrape_concurrency": 3,                  # search profiles scraped in parallel, one browser each
     "search_profiles": [
         {
             "name": "Example Search",